@@ -0,0 +1,133 @@
+"""Stand-in for the llm_client service, for benchmarks.
+
+Implements the endpoints the backend calls, with no model behind them.
+Latencies are read from the environment, in seconds:
+
+    FAKE_LLM_COMPLETION_LATENCY  total time of a completion (default 1.0)
+    FAKE_LLM_INGEST_LATENCY      per ingested file (default 0.5)
+    FAKE_LLM_EMBEDDING_LATENCY   per embedding (default 0.02)
+
+Run with: uvicorn benchmarks.fake_llm_client:app --port 8001
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+
+from fastapi import FastAPI, Request, UploadFile
+from fastapi.responses import StreamingResponse
+
+COMPLETION_LATENCY = float(os.getenv("FAKE_LLM_COMPLETION_LATENCY", "1.0"))
+INGEST_LATENCY = float(os.getenv("FAKE_LLM_INGEST_LATENCY", "0.5"))
+EMBEDDING_LATENCY = float(os.getenv("FAKE_LLM_EMBEDDING_LATENCY", "0.02"))
+# The answer is streamed in this many pieces over the completion latency
+STREAM_CHUNKS = 20
+
+app = FastAPI()
+documents: dict[str, str] = {}
+
+
+def _document(doc_id: str, file_name: str) -> dict:
+    return {
+        "object": "ingest.document",
+        "doc_id": doc_id,
+        "doc_metadata": {"file_name": file_name},
+    }
+
+
+async def _ingest(file: UploadFile) -> dict:
+    await file.read()
+    await asyncio.sleep(INGEST_LATENCY)
+    doc_id = str(uuid.uuid4())
+    documents[doc_id] = file.filename or "unnamed"
+    return _document(doc_id, documents[doc_id])
+
+
+@app.post("/v1/ingest/file")
+async def ingest_file(file: UploadFile):
+    return {"object": "list", "model": "private-gpt", "data": [await _ingest(file)]}
+
+
+@app.post("/v1/ingest/files")
+async def ingest_files(files: list[UploadFile]):
+    data = [await _ingest(file) for file in files]
+    return {"object": "list", "model": "private-gpt", "data": data}
+
+
+@app.get("/v1/ingest/list")
+async def list_ingested():
+    data = [_document(doc_id, name) for doc_id, name in documents.items()]
+    return {"object": "list", "model": "private-gpt", "data": data}
+
+
+@app.delete("/v1/ingest/{doc_id}")
+async def delete_ingested(doc_id: str):
+    documents.pop(doc_id, None)
+
+
+@app.post("/v1/ingest/delete")
+async def delete_ingested_bulk(request: Request):
+    for doc_id in (await request.json())["doc_ids"]:
+        documents.pop(doc_id, None)
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    text = (await request.json())["input"]
+    await asyncio.sleep(EMBEDDING_LATENCY)
+    vector = [float(text.count(letter)) for letter in "abcdefghijklmnopqrstuvwxyz"]
+    return {
+        "object": "list",
+        "model": "private-gpt",
+        "data": [{"index": 0, "object": "embedding", "embedding": vector}],
+    }
+
+
+def _sources(body: dict) -> list[dict]:
+    doc_ids = (body.get("context_filter") or {}).get("docs_ids") or []
+    return [
+        {
+            "object": "context.chunk",
+            "score": 1.0,
+            "document": _document(doc_id, documents.get(doc_id, "unknown.pdf")),
+            "text": "Lorem ipsum dolor sit amet.",
+        }
+        for doc_id in doc_ids[:1]
+    ]
+
+
+def _completion(content: dict, body: dict, chunk: bool) -> dict:
+    choice = {"index": 0, "finish_reason": None if chunk else "stop"}
+    choice["delta" if chunk else "message"] = content
+    if body.get("include_sources"):
+        choice["sources"] = _sources(body)
+    return {
+        "id": str(uuid.uuid4()),
+        "object": "completion.chunk" if chunk else "completion",
+        "created": int(time.time()),
+        "model": "private-gpt",
+        "choices": [choice],
+    }
+
+
+@app.post("/v1/completions")
+async def completions(request: Request):
+    body = await request.json()
+    answer = f"A synthetic answer to: {body['prompt'][:200]}"
+    if not body.get("stream"):
+        await asyncio.sleep(COMPLETION_LATENCY)
+        return _completion({"role": "assistant", "content": answer}, body, chunk=False)
+
+    async def stream():
+        words = answer.split(" ")
+        step = max(1, len(words) // STREAM_CHUNKS)
+        for start in range(0, len(words), step):
+            await asyncio.sleep(COMPLETION_LATENCY / STREAM_CHUNKS)
+            piece = " ".join(words[start : start + step]) + " "
+            chunk = _completion({"content": piece}, body, chunk=True)
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
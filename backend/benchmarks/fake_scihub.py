@@ -0,0 +1,63 @@
+"""Stand-in for Sci-Hub and its PDF mirror, for benchmarks.
+
+`GET /{doi}` returns a page embedding `/downloads/<doi>.pdf`, and the PDF
+is generated per DOI, so every DOI yields distinct content. Responses
+carry an ETag and honour If-None-Match.
+
+    FAKE_SCIHUB_LATENCY  seconds per request (default 0.1)
+    FAKE_SCIHUB_PAGES    pages per generated PDF (default 8)
+
+Run with: uvicorn benchmarks.fake_scihub:app --port 8002
+"""
+
+import asyncio
+import hashlib
+import os
+from functools import lru_cache
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse
+
+LATENCY = float(os.getenv("FAKE_SCIHUB_LATENCY", "0.1"))
+PAGES = int(os.getenv("FAKE_SCIHUB_PAGES", "8"))
+
+app = FastAPI()
+
+
+@lru_cache(maxsize=1024)
+def make_pdf(title: str, pages: int = PAGES) -> bytes:
+    import fitz  # PyMuPDF
+
+    with fitz.open() as pdf:
+        for number in range(pages):
+            page = pdf.new_page()
+            page.insert_text(
+                (72, 72),
+                f"{title}, page {number + 1}\n"
+                "We study the folding of proteins and the topology of graphs.",
+            )
+        return pdf.tobytes()
+
+
+def _etag(content: bytes) -> str:
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+@app.get("/downloads/{name}")
+async def download(name: str, request: Request):
+    await asyncio.sleep(LATENCY)
+    content = await asyncio.to_thread(make_pdf, name.removesuffix(".pdf"))
+    etag = _etag(content)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content, media_type="application/pdf", headers={"ETag": etag})
+
+
+@app.get("/{doi:path}")
+async def page(doi: str):
+    await asyncio.sleep(LATENCY)
+    name = doi.replace("/", "_")
+    return HTMLResponse(
+        f'<html><body><embed type="application/pdf" src="/downloads/{name}.pdf">'
+        "</body></html>"
+    )
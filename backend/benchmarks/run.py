@@ -0,0 +1,339 @@
+"""Load test the backend against local stand-ins for its dependencies.
+
+Boots the fake llm_client, the fake Sci-Hub and `src.main:app` (each in its
+own process, the backend in a throwaway working directory), seeds a few
+papers, then drives a weighted mix of requests at a fixed concurrency and
+reports throughput and latency percentiles per operation. Run from
+`backend/`:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --concurrency 32 --duration 60 \\
+        --mix chat=5,history=3,files=2,upload=1 --llm-latency 2.0
+
+Operations: chat, chat_stream, history, files, search, upload, doi.
+chat_stream also records time to first token as chat_stream_ttft.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_scihub import make_pdf
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+QUESTIONS = [
+    "What is the main contribution?",
+    "Summarize the method.",
+    "What datasets are used?",
+    "What are the limitations?",
+    "How does this compare to prior work?",
+    "What are the key results?",
+]
+
+_unique = itertools.count()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app: str, port: int, cwd: Path, env: dict, log: Path):
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            app,
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR), **env},
+        stdout=log.open("w"),
+        stderr=subprocess.STDOUT,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(url)).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up in {timeout:.0f}s")
+
+
+async def wait_for_jobs(client: httpx.AsyncClient, job_ids: list[int]):
+    pending = set(job_ids)
+    while pending:
+        for job_id in list(pending):
+            job = (await client.get(f"/jobs/{job_id}")).json()
+            if job["status"] in ("done", "failed"):
+                pending.discard(job_id)
+        await asyncio.sleep(0.2)
+
+
+async def upload(client: httpx.AsyncClient, name: str) -> dict:
+    content = await asyncio.to_thread(make_pdf, name)
+    response = await client.post(
+        "/process-pdf", files={"file": (f"{name}.pdf", content, "application/pdf")}
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+class Workload:
+    def __init__(self, client: httpx.AsyncClient, papers: list[str]):
+        self.client = client
+        self.papers = papers
+
+    async def chat(self, record):
+        response = await self.client.post(
+            "/chat-with-doc",
+            json={
+                "prompt": random.choice(QUESTIONS),
+                "filename": random.choice(self.papers),
+            },
+        )
+        response.raise_for_status()
+
+    async def chat_stream(self, record):
+        started = time.perf_counter()
+        first_token = None
+        async with self.client.stream(
+            "POST",
+            "/chat-with-doc/stream",
+            json={
+                "prompt": random.choice(QUESTIONS),
+                "filename": random.choice(self.papers),
+            },
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if first_token is None and line.startswith("event: token"):
+                    first_token = time.perf_counter() - started
+                if line.startswith("event: error"):
+                    raise RuntimeError("stream reported an error")
+        if first_token is not None:
+            record("chat_stream_ttft", first_token, True)
+
+    async def history(self, record):
+        response = await self.client.get(f"/chat-history/{random.choice(self.papers)}")
+        response.raise_for_status()
+
+    async def files(self, record):
+        (await self.client.get("/files")).raise_for_status()
+
+    async def search(self, record):
+        response = await self.client.get("/search", params={"q": "protein folding"})
+        response.raise_for_status()
+
+    async def upload(self, record):
+        await upload(self.client, f"bench-upload-{os.getpid()}-{next(_unique)}")
+
+    async def doi(self, record):
+        response = await self.client.post(
+            "/process-doi", json={"doi": f"10.9999/bench.{os.getpid()}.{next(_unique)}"}
+        )
+        response.raise_for_status()
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if not hasattr(Workload, name):
+            raise SystemExit(f"Unknown operation in --mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def report(samples: dict[str, list], elapsed: float) -> dict:
+    results = {}
+    for name, entries in sorted(samples.items()):
+        latencies = [latency for latency, ok in entries if ok]
+        errors = sum(1 for _, ok in entries if not ok)
+        results[name] = {
+            "count": len(entries),
+            "errors": errors,
+            "rps": len(entries) / elapsed,
+            **(
+                {f"p{q}": percentile(latencies, q) * 1000 for q in (50, 90, 99)}
+                | {"max": max(latencies) * 1000}
+                if latencies
+                else {}
+            ),
+        }
+
+    print(
+        f"\n{'operation':<18}{'count':>8}{'errors':>8}{'rps':>9}"
+        f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    )
+    for name, row in results.items():
+        print(
+            f"{name:<18}{row['count']:>8}{row['errors']:>8}{row['rps']:>9.1f}"
+            + "".join(
+                f"{row.get(key, float('nan')):>10.1f}"
+                for key in ("p50", "p90", "p99", "max")
+            )
+        )
+    total = sum(
+        row["count"] for name, row in results.items() if name != "chat_stream_ttft"
+    )
+    print(f"\n{total} requests in {elapsed:.1f}s, {total / elapsed:.1f} req/s")
+    return results
+
+
+async def drive(args, backend_url: str) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(
+        base_url=backend_url, timeout=args.request_timeout, limits=limits
+    ) as client:
+        await wait_ready(client, "/files")
+
+        print(f"Seeding {args.papers} papers...")
+        seeded = await asyncio.gather(
+            *(upload(client, f"bench-paper-{number}") for number in range(args.papers))
+        )
+        await wait_for_jobs(
+            client, [entry["job_id"] for entry in seeded if "job_id" in entry]
+        )
+        papers = [f"bench-paper-{number}.pdf" for number in range(args.papers)]
+
+        workload = Workload(client, papers)
+        weights = parse_mix(args.mix)
+        operations, op_weights = list(weights), list(weights.values())
+        samples: dict[str, list] = defaultdict(list)
+
+        def record(name: str, latency: float, ok: bool):
+            samples[name].append((latency, ok))
+
+        async def worker(deadline: float):
+            while time.monotonic() < deadline:
+                name = random.choices(operations, op_weights)[0]
+                started = time.perf_counter()
+                try:
+                    await getattr(workload, name)(record)
+                    ok = True
+                except (httpx.HTTPError, RuntimeError):
+                    ok = False
+                record(name, time.perf_counter() - started, ok)
+
+        print(
+            f"Running {args.mix} at concurrency {args.concurrency} for {args.duration:.0f}s..."
+        )
+        started = time.monotonic()
+        await asyncio.gather(
+            *(worker(started + args.duration) for _ in range(args.concurrency))
+        )
+        return report(samples, time.monotonic() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--mix", default="chat=5,history=3,files=2,upload=1")
+    parser.add_argument("--papers", type=int, default=10, help="papers to seed")
+    parser.add_argument(
+        "--llm-latency", type=float, default=1.0, help="seconds per completion"
+    )
+    parser.add_argument(
+        "--ingest-latency", type=float, default=0.5, help="seconds per file"
+    )
+    parser.add_argument(
+        "--scihub-latency", type=float, default=0.1, help="seconds per request"
+    )
+    parser.add_argument("--request-timeout", type=float, default=60.0)
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    parser.add_argument(
+        "--keep", action="store_true", help="keep the working directory"
+    )
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="backend-bench-"))
+    # The backend keeps its database in its cwd and PDFs in ../Media
+    (workdir / "app").mkdir()
+    llm_port, scihub_port, backend_port = free_port(), free_port(), free_port()
+    processes = [
+        start_server(
+            "benchmarks.fake_llm_client:app",
+            llm_port,
+            BACKEND_DIR,
+            {
+                "FAKE_LLM_COMPLETION_LATENCY": str(args.llm_latency),
+                "FAKE_LLM_INGEST_LATENCY": str(args.ingest_latency),
+            },
+            workdir / "fake_llm_client.log",
+        ),
+        start_server(
+            "benchmarks.fake_scihub:app",
+            scihub_port,
+            BACKEND_DIR,
+            {"FAKE_SCIHUB_LATENCY": str(args.scihub_latency)},
+            workdir / "fake_scihub.log",
+        ),
+        start_server(
+            "src.main:app",
+            backend_port,
+            workdir / "app",
+            {
+                "LLM_CLIENT_URL": f"http://127.0.0.1:{llm_port}",
+                "SCIHUB_URL": f"http://127.0.0.1:{scihub_port}",
+            },
+            workdir / "backend.log",
+        ),
+    ]
+    try:
+        results = asyncio.run(drive(args, f"http://127.0.0.1:{backend_port}"))
+        if args.json:
+            args.json.write_text(
+                json.dumps(
+                    {"args": vars(args) | {"json": str(args.json)}, "results": results},
+                    indent=2,
+                )
+            )
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if args.keep:
+            print(f"Logs and data kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Report where backend startup time goes.
+
+Imports the app in a fresh interpreter with `python -X importtime` and
+prints the slowest modules and top-level packages. Run from `backend/`:
+
+    python scripts/import_report.py
+    python scripts/import_report.py --module src.main --top 30
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+def import_times(module: str) -> tuple[list[tuple[str, int, int]], float]:
+    """Return (module, self_us, cumulative_us) per import, and the wall time."""
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    rows, elapsed = import_times(args.module)
+    total_us = sum(self_us for _, self_us, _ in rows)
+    print(
+        f"import {args.module}: {total_us / 1000:.0f} ms in imports, "
+        f"{elapsed * 1000:.0f} ms for the whole interpreter"
+    )
+
+    print(f"\nSlowest modules (cumulative, top {args.top}):")
+    for name, _, cumulative_us in sorted(rows, key=lambda row: -row[2])[: args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    packages: dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    print(f"\nSlowest top-level packages (self time, top {args.top}):")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[
+        : args.top
+    ]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+
+if __name__ == "__main__":
+    main()
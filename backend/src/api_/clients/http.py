@@ -0,0 +1,59 @@
+import asyncio
+from urllib.parse import urlsplit
+
+import aiohttp
+
+
+class HttpSession:
+    """Application-scoped aiohttp session, opened and closed in the lifespan.
+
+    Outbound calls to Sci-Hub and PDF mirrors share its connection pool
+    instead of paying for a new connector and TLS handshake per request.
+    """
+
+    def __init__(
+        self,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 60,
+        min_interval_per_host: float = 0.0,
+    ):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.min_interval_per_host = min_interval_per_host
+        self._session: aiohttp.ClientSession | None = None
+        self._next_slot: dict[str, float] = {}
+
+    async def start(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+
+    async def close(self):
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+    async def throttle(self, url: str):
+        """Wait for this host's next request slot.
+
+        Requests to one host are spaced at least `min_interval_per_host`
+        seconds apart. Slots are reserved without awaiting, so concurrent
+        callers line up instead of all firing at once.
+        """
+        if self.min_interval_per_host <= 0:
+            return
+        host = urlsplit(url).netloc
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.min_interval_per_host
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            raise RuntimeError("HTTP session is not started")
+        return self._session
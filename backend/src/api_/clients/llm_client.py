@@ -0,0 +1,199 @@
+import asyncio
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, TypeVar
+
+import httpx
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from src.metrics import time_outbound
+from src.schemas.llm_client import Completion, EmbeddingResponse, IngestResponse
+
+T = TypeVar("T")
+
+
+class LLMClient:
+    """Non-blocking client for the llm_client service.
+
+    All calls share one keep-alive connection pool, at most `max_concurrency`
+    of them are in flight at a time (the rest wait their turn instead of
+    piling onto the llm_client), and each one is bounded by a timeout.
+
+    The endpoints are called directly rather than through pgpt_python, whose
+    calls hardcode a 60s timeout of their own.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = 20,
+        max_concurrency: int = 16,
+        timeout: float = 120.0,
+        ingest_timeout: float = 500.0,
+    ):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.ingest_timeout = ingest_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http: httpx.AsyncClient | None = None
+
+    async def start(self):
+        if self._http is not None:
+            return
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=60,
+            ),
+        )
+
+    async def close(self):
+        if self._http is None:
+            return
+        http, self._http = self._http, None
+        await http.aclose()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            raise RuntimeError("LLM client is not started")
+        return self._http
+
+    async def _call(
+        self, operation: str, call: Awaitable[T], timeout: float | None = None
+    ) -> T:
+        async with self._semaphore:
+            try:
+                with time_outbound("llm_client", operation):
+                    return await asyncio.wait_for(call, timeout or self.timeout)
+            # httpx gives up on its own when a read outlasts the timeout
+            except (asyncio.TimeoutError, httpx.TimeoutException):
+                raise HTTPException(
+                    status_code=504, detail="The LLM service did not answer in time"
+                )
+
+    async def _request(
+        self,
+        operation: str,
+        method: str,
+        url: str,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        timeout = timeout or self.timeout
+        response = await self._call(
+            operation,
+            self.http.request(method, url, timeout=timeout, **kwargs),
+            timeout,
+        )
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _read_files(file_paths: list[Path | str]) -> list[tuple[str, bytes]]:
+        return [(Path(path).name, Path(path).read_bytes()) for path in file_paths]
+
+    async def ingest_file(self, file_path: Path | str):
+        [(name, content)] = await run_in_threadpool(self._read_files, [file_path])
+        response = await self._request(
+            "ingest_file",
+            "POST",
+            "/v1/ingest/file",
+            self.ingest_timeout,
+            files={"file": (name, content, "application/pdf")},
+        )
+        return IngestResponse.model_validate_json(response.content).data
+
+    async def bulk_ingest(self, file_paths: list[Path]):
+        """Ingest several files with one request to `/v1/ingest/files`."""
+        files = await run_in_threadpool(self._read_files, file_paths)
+        response = await self._request(
+            "bulk_ingest",
+            "POST",
+            "/v1/ingest/files",
+            self.ingest_timeout,
+            files=[
+                ("files", (name, content, "application/pdf")) for name, content in files
+            ],
+        )
+        return IngestResponse.model_validate_json(response.content).data
+
+    async def list_ingested(self):
+        response = await self._request("list_ingested", "GET", "/v1/ingest/list")
+        return IngestResponse.model_validate_json(response.content).data
+
+    async def delete_ingested(self, doc_id: str):
+        await self._request("delete_ingested", "DELETE", f"/v1/ingest/{doc_id}")
+
+    async def bulk_delete(self, doc_ids: list[str]):
+        """Delete many documents with one request to `/v1/ingest/delete`."""
+        if not doc_ids:
+            return
+        await self._request(
+            "bulk_delete", "POST", "/v1/ingest/delete", json={"doc_ids": doc_ids}
+        )
+
+    async def embed(self, text: str) -> list[float]:
+        response = await self._request(
+            "embed", "POST", "/v1/embeddings", json={"input": text}
+        )
+        return EmbeddingResponse.model_validate_json(response.content).data[0].embedding
+
+    async def prompt_completion(self, prompt: str, **kwargs: Any) -> Completion:
+        response = await self._request(
+            "completion",
+            "POST",
+            "/v1/completions",
+            json={"prompt": prompt, "stream": False, **kwargs},
+        )
+        return Completion.model_validate_json(response.content)
+
+    async def _completion_chunks(
+        self, prompt: str, **kwargs: Any
+    ) -> AsyncIterator[Completion]:
+        async with self.http.stream(
+            "POST",
+            "/v1/completions",
+            json={"prompt": prompt, "stream": True, **kwargs},
+        ) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line.removeprefix("data:").strip()
+                if data == "[DONE]":
+                    return
+                yield Completion.model_validate_json(data)
+
+    async def prompt_completion_stream(
+        self, prompt: str, **kwargs: Any
+    ) -> AsyncIterator[Completion]:
+        """Yield completion chunks as the llm_client generates them.
+
+        The stream holds one concurrency slot until it is exhausted or
+        closed, and each chunk (the first one included) must arrive within
+        the client timeout.
+        """
+        async with self._semaphore:
+            with time_outbound("llm_client", "completion_stream"):
+                stream = self._completion_chunks(prompt, **kwargs)
+                try:
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(anext(stream), self.timeout)
+                        except StopAsyncIteration:
+                            return
+                        except (asyncio.TimeoutError, httpx.TimeoutException):
+                            raise HTTPException(
+                                status_code=504,
+                                detail="The LLM service did not answer in time",
+                            )
+                        yield chunk
+                finally:
+                    await stream.aclose()
@@ -1,23 +1,73 @@
-from bs4 import BeautifulSoup
-from colorama import Back
-from fastapi import APIRouter, HTTPException, BackgroundTasks, File, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+import asyncio
+import logging
 import sqlite3
 import os
+import uuid
+from typing import Literal
 from pydantic import BaseModel
 from pathlib import Path
 
-from src.api_.clients.scihub import SciHubApi
-from src.consts import DOWNLOAD_FOLDER, DB_PATH
-from src.dependencies import pgpt_client, summary_store
-from src.services.summarization import (
-    background_summarize,
-    ingest_file_and_store,
+from src.consts import (
+    CHAT_HISTORY_MAX_PAGE_SIZE,
+    CHAT_HISTORY_PAGE_SIZE,
+    DOI_BATCH_MAX_SIZE,
+    DOWNLOAD_FOLDER,
+    SEARCH_MAX_PAGE_SIZE,
+    SEARCH_PAGE_SIZE,
+    SSE_KEEPALIVE_INTERVAL,
+    SSE_MAX_STREAM_DURATION,
+)
+from src.crud.database import Database
+from src.crud.doi_batches import create_batch, get_batch_items
+from src.crud.jobs import get_job
+from src.crud.search import search_conversations, search_pages, to_fts_query
+from src.dependencies import (
+    answer_cache,
+    doc_registry,
+    events,
+    get_db,
+    http_session,
+    job_queue,
+    llm_client,
+    scihub,
+    summary_jobs,
 )
-from src.services.pdf import download_pdf
-from src.crud.temp_cruds import get_mapping
-from src.schemas.process_doi import ProcessDOISchema
+from src.services.chat import stream_chat_answer
+from src.services.doi import resolve_doi
+from src.services.events import format_sse
+from src.services.file_serving import file_response
+from src.services.helper import file_sha256
+from src.services.file_operations import save_upload
+from src.crud.temp_cruds import (
+    delete_all_mappings,
+    delete_mapping,
+    delete_mappings,
+    get_conversation_history,
+    get_file_doc_ids,
+    get_file_id as get_file_id_for,
+    get_mapping,
+    get_mapping_by_hash,
+    get_mappings,
+    insert_conversation,
+    rename_mapping,
+)
+from src.schemas.process_doi import ProcessDOIBatchSchema, ProcessDOISchema
 from src.schemas.chat_request import ChatRequest
+from src.schemas.delete_files import DeleteFilesSchema
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -36,75 +86,120 @@ async def list_files():
 
 
 @router.get("/file/{file_name}")
-async def get_file(file_name: str):
+async def get_file(file_name: str, request: Request):
     file_path = DOWNLOAD_FOLDER / file_name
-    if file_path.exists():
-        return FileResponse(file_path)
+    if file_path.is_file():
+        return await file_response(request, file_path)
     raise HTTPException(status_code=404, detail="File not found")
 
 
 @router.get("/summarize/{file_name}")
-async def summarize_pdf(file_name: str, background_tasks: BackgroundTasks):
+async def summarize_pdf(file_name: str, db: Database = Depends(get_db)):
     file_path = DOWNLOAD_FOLDER / file_name
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="File not found")
 
-    background_tasks.add_task(
-        background_summarize,
-        pgpt_client,
-        summary_store,
-        file_path,
-        file_name,
-    )
+    job = await summary_jobs.submit(llm_client, db, file_path)
+    if job["status"] == "done":
+        return {**job, "message": "Summary already available.", "status_code": 200}
 
     return {
+        **job,
         "message": "Summarization started, you will be notified when it's done.",
         "status_code": 202,
     }
 
 
 @router.get("/summary/{file_name}")
-async def get_summary(file_name: str):
-    if file_name in summary_store:
-        return summary_store[file_name]
-    else:
-        raise HTTPException(
-            status_code=404, detail="Summary not found or still processing."
-        )
+async def get_summary(file_name: str, db: Database = Depends(get_db)):
+    file_path = DOWNLOAD_FOLDER / file_name
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="File not found")
+
+    job = await summary_jobs.get(db, file_path)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Summary not found.")
+    return job
+
+
+@router.get("/events/{topic}")
+async def stream_events(topic: str, request: Request, db: Database = Depends(get_db)):
+    """Server-sent events for a file name or a DOI batch id.
+
+    Pushes "summary" events (state and map-reduce progress) and "job" events
+    (ingestion / batch job state) as the background workers produce them.
+    """
+
+    async def stream():
+        deadline = asyncio.get_running_loop().time() + SSE_MAX_STREAM_DURATION
+        # Subscribe before taking the snapshot so no transition is missed
+        with events.subscribe(topic) as queue:
+            yield "retry: 1000\n\n"
+            file_path = DOWNLOAD_FOLDER / topic
+            if file_path.is_file():
+                job = await summary_jobs.get(db, file_path)
+                if job is not None:
+                    yield format_sse({"type": "summary", **job})
+            while not await request.is_disconnected():
+                if asyncio.get_running_loop().time() >= deadline:
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield format_sse(event)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/process-doi")
-async def process_doi(body: ProcessDOISchema, background_tasks: BackgroundTasks):
+async def process_doi(
+    body: ProcessDOISchema,
+    db: Database = Depends(get_db),
+):
     try:
         if not body.doi:
             raise HTTPException(status_code=400, detail="Provide a DOI")
 
-        _, html_content = await SciHubApi.get_page(body.doi)
-        print(html_content)
-        if not html_content:
-            raise HTTPException(status_code=500, detail="Empty response content")
-
-        soup = BeautifulSoup(html_content, "html.parser")
-        embed_tag = soup.find("embed")
-        if embed_tag and "src" in embed_tag.attrs:
-            pdf_url = embed_tag["src"]
-            
-            if pdf_url.startswith("//"):
-                pdf_url = "https:" + pdf_url
-                
-            pdf_filename = pdf_url.split("/")[-1].split("#")[0]
-            file_path = await download_pdf(pdf_url, pdf_filename)
-            background_tasks.add_task(ingest_file_and_store, pgpt_client, str(file_path), pdf_filename)
-          
-            if file_path:
-                return {
-                        "message": "PDF downloaded successfully. Processing in background.",
-                        "file_path": str(file_path),
-                    }
+        resolved = await resolve_doi(scihub, http_session, db, body.doi, body.refresh)
+        file_path = resolved["file_path"]
+        pdf_filename = resolved["filename"]
 
-        raise HTTPException(
-            status_code=404, detail="PDF download URL not found in the page content"
+        if await get_file_id_for(db, pdf_filename) is not None:
+            return {
+                "message": "PDF already downloaded and ingested.",
+                "file_path": str(file_path),
+            }
+
+        content_hash = resolved["content_hash"]
+        if content_hash is None:
+            content_hash = await run_in_threadpool(file_sha256, Path(file_path))
+        # A done ingest of these bytes whose file was deleted since must run
+        # again, or the paper could never be added back
+        rerun_done = await get_mapping_by_hash(db, content_hash) is None
+        job_id = await job_queue.enqueue(
+            db,
+            "ingest_file",
+            {
+                "file_path": str(file_path),
+                "filename": pdf_filename,
+                "content_hash": content_hash,
+            },
+            idempotency_key=f"ingest:{content_hash}",
+            rerun_done=rerun_done,
         )
+        return {
+            "message": "PDF downloaded successfully. Processing in background.",
+            "file_path": str(file_path),
+            "job_id": job_id,
+        }
 
     except HTTPException as he:
         raise he
@@ -114,10 +209,49 @@ async def process_doi(body: ProcessDOISchema, background_tasks: BackgroundTasks)
         )
 
 
+@router.post("/process-doi/batch")
+async def process_doi_batch(
+    body: ProcessDOIBatchSchema,
+    db: Database = Depends(get_db),
+):
+    # Drop blanks and repeats, keeping the order the DOIs were pasted in
+    dois = list(dict.fromkeys(doi.strip() for doi in body.dois if doi.strip()))
+    if not dois:
+        raise HTTPException(status_code=400, detail="Provide at least one DOI")
+    if len(dois) > DOI_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can contain at most {DOI_BATCH_MAX_SIZE} DOIs",
+        )
+
+    batch_id = uuid.uuid4().hex
+    await create_batch(db, batch_id, dois)
+    job_id = await job_queue.enqueue(
+        db,
+        "doi_batch",
+        {"batch_id": batch_id, "dois": dois, "refresh": body.refresh},
+        idempotency_key=f"doi_batch:{batch_id}",
+    )
+    return {
+        "batch_id": batch_id,
+        "job_id": job_id,
+        "items": await get_batch_items(db, batch_id),
+        "status_code": 202,
+    }
+
+
+@router.get("/process-doi/batch/{batch_id}")
+async def get_doi_batch(batch_id: str, db: Database = Depends(get_db)):
+    items = await get_batch_items(db, batch_id)
+    if not items:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return {"batch_id": batch_id, "items": items}
+
+
 @router.post("/process-pdf")
 async def process_pdf(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(None),
+    db: Database = Depends(get_db),
 ):
     try:
         if not file:
@@ -133,23 +267,63 @@ async def process_pdf(
                 raise HTTPException(status_code=400, detail="Empty filename")
 
             file_path = DOWNLOAD_FOLDER / file.filename
-            with open(file_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
+            tmp_path, content_hash = await save_upload(file, DOWNLOAD_FOLDER)
 
-            # Queue background ingestion
-            filename = file.filename
-            if filename is not None and background_tasks:
-                background_tasks.add_task(
-                    ingest_file_and_store,
-                    pgpt_client,
-                    str(file_path),
-                    filename,
+            # The same bytes were ingested before: nothing left to do
+            existing = await get_mapping_by_hash(db, content_hash)
+            if existing:
+                tmp_path.unlink(missing_ok=True)
+                existing_filename, doc_id = existing
+                return {
+                    "message": "PDF already uploaded, skipping ingestion.",
+                    "file_path": str(DOWNLOAD_FOLDER / existing_filename),
+                    "doc_id": doc_id,
+                }
+
+            # The name is taken by other bytes: overwriting them would leave
+            # the index serving the old content under the new one's name
+            if await get_file_id_for(db, file.filename) is not None:
+                tmp_path.unlink(missing_ok=True)
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"A different {file.filename} is already uploaded, "
+                    "delete it or rename this one first",
                 )
 
+            os.replace(tmp_path, file_path)
+
+            # Queue background ingestion
+            job_id = await job_queue.enqueue(
+                db,
+                "ingest_file",
+                {
+                    "file_path": str(file_path),
+                    "filename": file.filename,
+                    "content_hash": content_hash,
+                },
+                idempotency_key=f"ingest:{content_hash}",
+                # No file is mapped to these bytes (checked above), so a
+                # done ingest of them was deleted since
+                rerun_done=True,
+            )
+
+            # The same bytes are already being ingested under another name:
+            # that file is the one that gets mapped, so this copy would be
+            # left on disk unmapped
+            job = await get_job(db, job_id)
+            existing_filename = job["payload"]["filename"] if job else file.filename
+            if existing_filename != file.filename:
+                file_path.unlink(missing_ok=True)
+                return {
+                    "message": "PDF already uploaded, processing in background.",
+                    "file_path": str(DOWNLOAD_FOLDER / existing_filename),
+                    "job_id": job_id,
+                }
+
             return {
                 "message": "PDF uploaded successfully. Processing in background.",
                 "file_path": str(file_path),
+                "job_id": job_id,
             }
 
     except HTTPException as he:
@@ -160,56 +334,64 @@ async def process_pdf(
         )
 
 
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: int, db: Database = Depends(get_db)):
+    job = await get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
 @router.get("/mapping/{filename}")
-def get_file_mapping(filename: str):
+async def get_file_mapping(filename: str, db: Database = Depends(get_db)):
     """Fetch the GPT document ID for a given file."""
-    doc_id = get_mapping(filename)
+    doc_id = await get_mapping(db, filename)
     return {"filename": filename, "doc_id": doc_id}
 
 
 @router.get("/all_mapped")
-def get_all_mapped():
+async def get_all_mapped():
     """Fetch all the GPT document IDs mapped to filenames."""
-    return {"mappings": get_all_ingested()}
+    return {"mappings": await get_all_ingested()}
 
 
 @router.get("/list_of_ingested")
-def get_all_ingested():
-    data = pgpt_client.ingestion.list_ingested().data
+async def get_all_ingested():
+    data = await llm_client.list_ingested()
     return {"data": data}
 
+async def _mapped_doc_ids(db: Database, mapped: list[tuple]) -> set[str]:
+    """Every llm_client document of the mapped files, one per PDF page."""
+    file_doc_ids = await get_file_doc_ids(db, [filename for filename, _ in mapped])
+    doc_ids = {doc_id for _, doc_id in mapped}
+    doc_ids.update(id_ for ids in file_doc_ids.values() for id_ in ids)
+    # Files mapped before that only have their first document recorded,
+    # the rest are found by their file name
+    unrecorded = {filename for filename, ids in file_doc_ids.items() if not ids}
+    if unrecorded:
+        doc_ids.update(
+            doc.doc_id
+            for doc in await llm_client.list_ingested()
+            if (doc.doc_metadata or {}).get("file_name") in unrecorded
+        )
+    return doc_ids
+
+
 @router.delete("/delete_ingested/{filename}")
-async def delete_ingested(filename: str):
+async def delete_ingested(filename: str, db: Database = Depends(get_db)):
     try:
-        # First, get the doc_id from the database
-        doc_id = get_mapping(filename)
-        if not doc_id:
+        mapped = await get_mappings(db, [filename])
+        if not mapped:
             raise HTTPException(status_code=404, detail="File not found in database")
 
-        # Delete from PrivateGPT
-        try:
-            pgpt_client.ingestion.delete_ingested(doc_id)
-        except Exception as e:
-            print(f"Error deleting from PrivateGPT: {e}")
-            # Continue with other deletions even if PrivateGPT deletion fails
-
-        # Delete from database
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        try:
-            # Delete from file_gpt_map
-            cursor.execute("DELETE FROM file_gpt_map WHERE filename = ?", (filename,))
-            # Delete associated conversations
-            cursor.execute(
-                """
-                DELETE FROM conversation_history 
-                WHERE file_id IN (SELECT id FROM file_gpt_map WHERE filename = ?)
-                """, 
-                (filename,)
-            )
-            conn.commit()
-        finally:
-            conn.close()
+        # Every page of the file, or they would keep showing up in answers.
+        # The mapping, which records them, only goes once they are all gone
+        doc_ids = await _mapped_doc_ids(db, mapped)
+        await llm_client.bulk_delete(list(doc_ids))
+        doc_registry.discard(doc_ids)
+
+        # Delete the mapping, its documents and conversations from the database
+        await delete_mapping(db, filename)
 
         # Delete the actual file
         file_path = DOWNLOAD_FOLDER / filename
@@ -217,150 +399,194 @@ async def delete_ingested(filename: str):
             os.remove(file_path)  # Using os.remove instead of Path.unlink() for better error handling
 
         return {"message": "File deleted successfully"}
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/delete_ingested")
+async def delete_ingested_files(
+    body: DeleteFilesSchema, db: Database = Depends(get_db)
+):
+    """Delete several files, their documents and conversations at once."""
+    filenames = list(dict.fromkeys(body.filenames))
+    if not filenames:
+        raise HTTPException(status_code=400, detail="Provide at least one filename")
+
+    mapped = await get_mappings(db, filenames)
+    mapped_names = {filename for filename, _ in mapped}
+    doc_ids = await _mapped_doc_ids(db, mapped)
+    await llm_client.bulk_delete(list(doc_ids))
+    doc_registry.discard(doc_ids)
+    await delete_mappings(db, filenames)
+
+    for filename in filenames:
+        (DOWNLOAD_FOLDER / filename).unlink(missing_ok=True)
+
+    return {
+        "deleted": [filename for filename in filenames if filename in mapped_names],
+        "not_found": [filename for filename in filenames if filename not in mapped_names],
+    }
+
+
 @router.delete("/delete_all_ingested")
-def delete_all_ingested():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM file_gpt_map")
-    conn.commit()
-    conn.close()
-    
+async def delete_all_ingested(db: Database = Depends(get_db)):
+    await delete_all_mappings(db)
+
     for file in DOWNLOAD_FOLDER.iterdir():
         if file.is_file() and file.suffix == ".pdf":
             file.unlink()
 
-    list_ids = get_all_ingested()
-    list_ids = list_ids["data"]
-    for doc in list_ids:
-        pgpt_client.ingestion.delete_ingested(doc.doc_id)
-        
+    docs = await llm_client.list_ingested()
+    await llm_client.bulk_delete([doc.doc_id for doc in docs])
+    doc_registry.clear()
+
     return {"message": "All ingested files deleted successfully"}
 
 
 
 @router.post("/chat-with-doc")
-async def chat_with_doc(request: ChatRequest):
+async def chat_with_doc(request: ChatRequest, db: Database = Depends(get_db)):
     """Use GPT for contextual completion with a specific document."""
     filename = request.filename
     prompt = request.prompt
-    print(filename)
+    logger.debug("Chat with %s: %s", filename, prompt)
 
-    doc_id = get_mapping(filename)
+    doc_id = await get_mapping(db, filename)
     if not doc_id:
         raise HTTPException(
             status_code=404, detail="Document ID not found for the given file"
         )
     
-    list_ids = get_all_ingested()
-    list_ids = list_ids["data"]
-    
-    found = False
-    for doc in list_ids:
-        if doc.doc_id == doc_id:
-            print(f"found {doc_id}")
-            found = True
-            break
-        
-    if found == False:
+    if not await doc_registry.contains(llm_client, doc_id):
         return
-    
+
+    cached = await answer_cache.get(llm_client, doc_id, prompt)
+    if cached is not None:
+        await insert_conversation(db, filename, prompt, cached["response"])
+        sources = cached["sources"]
+        return {"response": cached["response"], "source": sources[0] if sources else None}
+
     try:
-        result = pgpt_client.contextual_completions.prompt_completion(
+        result = await llm_client.prompt_completion(
             prompt=prompt,
             use_context=True,
             context_filter={"docs_ids": [doc_id]},
             include_sources=True,
         )
-        print(result)
+        logger.debug("Completion for %s: %s", filename, result)
         result = result.choices[0]
         
+        sources = [
+            source.document.doc_metadata["file_name"] for source in result.sources
+        ]
+
         # Store conversation in the database
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        try:
-            # Get file_id from filename
-            cursor.execute("SELECT id FROM file_gpt_map WHERE filename = ?", (filename,))
-            file_id_result = cursor.fetchone()
-            if file_id_result:
-                file_id = file_id_result[0]
-                cursor.execute(
-                    """
-                    INSERT INTO conversation_history (file_id, question, answer)
-                    VALUES (?, ?, ?)
-                    """,
-                    (file_id, prompt, result.message.content)
-                )
-                conn.commit()
-        finally:
-            conn.close()
-        
+        await insert_conversation(db, filename, prompt, result.message.content)
+        await answer_cache.put(
+            llm_client,
+            doc_id,
+            prompt,
+            {"response": result.message.content, "sources": sources},
+        )
+
         return {
             "response": result.message.content,
-            "source": result.sources[0].document.doc_metadata["file_name"],
+            "source": sources[0],
         }
     except Exception as e:
-        print(e)
+        logger.exception("Chat with %s failed", filename)
         raise HTTPException(status_code=500, detail=f"Error during chat: {str(e)}")
 
 
+@router.post("/chat-with-doc/stream")
+async def chat_with_doc_stream(request: ChatRequest, db: Database = Depends(get_db)):
+    """Streaming variant of /chat-with-doc, sent as server-sent events."""
+    doc_id = await get_mapping(db, request.filename)
+    if not await doc_registry.contains(llm_client, doc_id):
+        raise HTTPException(status_code=404, detail="Document is not ingested yet")
+
+    return StreamingResponse(
+        stream_chat_answer(
+            llm_client, db, answer_cache, request.filename, doc_id, request.prompt
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/chat-history/{filename}")
-async def get_chat_history(filename: str):
-    """Get chat history for a specific file"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+async def get_chat_history(
+    filename: str,
+    response: Response,
+    before: int | None = None,
+    limit: int = Query(CHAT_HISTORY_PAGE_SIZE, ge=1, le=CHAT_HISTORY_MAX_PAGE_SIZE),
+    db: Database = Depends(get_db),
+):
+    """Get the latest chat history page for a specific file, oldest first.
+
+    When older entries exist, the `X-Next-Before` header holds the cursor to
+    pass as `before` to fetch the preceding page.
+    """
     try:
-        cursor.execute(
-            """
-            SELECT ch.question, ch.answer, ch.timestamp
-            FROM conversation_history ch
-            JOIN file_gpt_map fm ON ch.file_id = fm.id
-            WHERE fm.filename = ?
-            ORDER BY ch.timestamp ASC
-            """,
-            (filename,)
-        )
-        rows = cursor.fetchall()
+        rows = await get_conversation_history(db, filename, limit, before)
+        if len(rows) == limit:
+            response.headers["X-Next-Before"] = str(rows[-1][0])
         return [
             {
-                "question": row[0],
-                "answer": row[1],
-                "timestamp": row[2]
+                "id": row[0],
+                "question": row[1],
+                "answer": row[2],
+                "timestamp": row[3]
             }
-            for row in rows
+            for row in reversed(rows)
         ]
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
+
+
+@router.get("/search")
+async def search(
+    q: str,
+    scope: Literal["all", "conversations", "pages"] = "all",
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=SEARCH_MAX_PAGE_SIZE),
+    db: Database = Depends(get_db),
+):
+    """Keyword search over past Q&A and the text of every ingested paper.
+
+    Results are ranked by BM25, best first. Their text is HTML-escaped and
+    matches are wrapped in <mark>.
+    """
+    query = to_fts_query(q)
+    if query is None:
+        raise HTTPException(status_code=400, detail="Provide words to search for")
+
+    results = {}
+    if scope in ("all", "conversations"):
+        results["conversations"] = await search_conversations(db, query, limit)
+    if scope in ("all", "pages"):
+        results["pages"] = await search_pages(db, query, limit)
+    return results
 
 
 @router.get("/file-id/{filename}")
-async def get_file_id(filename: str):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+async def get_file_id(filename: str, db: Database = Depends(get_db)):
     try:
-        cursor.execute(
-            "SELECT id FROM file_gpt_map WHERE filename = ?",
-            (filename,)
-        )
-        result = cursor.fetchone()
-        if not result:
-            raise HTTPException(status_code=404, detail="File not found")
-        return {"id": result[0]}
+        file_id = await get_file_id_for(db, filename)
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
+    if file_id is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return {"id": file_id}
 
 
 class RenameRequest(BaseModel):
     new_filename: str
 
 @router.put("/rename-file/{filename}")
-async def rename_file(filename: str, request: RenameRequest):
+async def rename_file(
+    filename: str, request: RenameRequest, db: Database = Depends(get_db)
+):
     try:
         # Ensure new filename has .pdf extension
         if not request.new_filename.lower().endswith('.pdf'):
@@ -379,52 +605,22 @@ async def rename_file(filename: str, request: RenameRequest):
             raise HTTPException(status_code=400, detail="A file with this name already exists")
 
         # Get the doc_id before updating the database
-        doc_id = get_mapping(filename)
+        doc_id = await get_mapping(db, filename)
         if not doc_id:
             raise HTTPException(status_code=404, detail="File not found in database")
 
         # Update the database
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
         try:
-            # Update file_gpt_map table
-            cursor.execute(
-                "UPDATE file_gpt_map SET filename = ? WHERE filename = ?",
-                (request.new_filename, filename)
-            )
-            
-            # Update conversation_history table references if needed
-            cursor.execute(
-                """
-                UPDATE conversation_history 
-                SET file_id = (SELECT id FROM file_gpt_map WHERE filename = ?)
-                WHERE file_id = (SELECT id FROM file_gpt_map WHERE filename = ?)
-                """,
-                (request.new_filename, filename)
-            )
-            
-            conn.commit()
+            await rename_mapping(db, filename, request.new_filename)
         except sqlite3.Error as e:
-            conn.rollback()
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-        finally:
-            conn.close()
 
         # Rename the actual file
         try:
             os.rename(old_file_path, new_file_path)
         except OSError as e:
             # If file rename fails, revert database changes
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            try:
-                cursor.execute(
-                    "UPDATE file_gpt_map SET filename = ? WHERE filename = ?",
-                    (filename, request.new_filename)
-                )
-                conn.commit()
-            finally:
-                conn.close()
+            await rename_mapping(db, request.new_filename, filename)
             raise HTTPException(status_code=500, detail=f"Failed to rename file: {str(e)}")
 
         return {
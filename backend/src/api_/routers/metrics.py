@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from src.crud.database import Database
+from src.crud.jobs import count_jobs_by_status
+from src.dependencies import get_db
+from src.metrics import JOB_QUEUE_DEPTH
+
+router = APIRouter(tags=["metrics"])
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+
+@router.get("/metrics")
+async def metrics(db: Database = Depends(get_db)):
+    """Prometheus scrape endpoint."""
+    # Read at scrape time, so the table stays the single source of truth
+    counts = await count_jobs_by_status(db)
+    for status in JOB_STATUSES:
+        JOB_QUEUE_DEPTH.labels(status=status).set(counts.get(status, 0))
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,5 +1,62 @@
+import os
 from pathlib import Path
 
 DB_PATH = Path("file_gpt_map.db")
+DB_POOL_SIZE = 8
+# File hashes kept in memory, keyed by path, size and mtime
+FILE_HASH_CACHE_SIZE = 4096
+SUMMARY_CONCURRENCY = 2
+# Map-reduce summarization: chunk size in (estimated) tokens and the number
+# of chunk prompts in flight against the llm_client at once
+SUMMARY_CHUNK_TOKENS = 1500
+SUMMARY_MAP_CONCURRENCY = 4
+# Chat answer cache. The fingerprint names the model and settings behind the
+# llm_client; change it whenever they change. Setting a similarity threshold
+# (cosine, e.g. 0.95) also serves answers to near-identical questions.
+ANSWER_CACHE_SIZE = 1024
+ANSWER_CACHE_TTL = 24 * 3600.0
+ANSWER_CACHE_FINGERPRINT = os.getenv("LLM_MODEL_FINGERPRINT", "default")
+ANSWER_CACHE_SIMILARITY = (
+    float(os.environ["ANSWER_CACHE_SIMILARITY"])
+    if os.getenv("ANSWER_CACHE_SIMILARITY")
+    else None
+)
+# PDF text extraction: worker processes, and pages parsed per task
+EXTRACTION_WORKERS = min(4, os.cpu_count() or 1)
+EXTRACTION_PAGES_PER_TASK = 16
+LLM_CLIENT_URL = os.getenv("LLM_CLIENT_URL", "http://localhost:8001")
+LLM_CLIENT_MAX_CONNECTIONS = 20
+# Calls beyond this wait in the backend instead of queueing on the llm_client
+LLM_CLIENT_MAX_CONCURRENCY = 16
+LLM_CLIENT_TIMEOUT = 120.0
+LLM_CLIENT_INGEST_TIMEOUT = 500.0
+# Seconds between full doc-id syncs with the llm_client
+DOC_REGISTRY_RECONCILE_INTERVAL = 300.0
+SCIHUB_URL = os.getenv("SCIHUB_URL", "https://sci-hub.ru")
+HTTP_LIMIT_PER_HOST = 10
+# Minimum spacing between two requests to the same outbound host (seconds)
+HTTP_MIN_INTERVAL_PER_HOST = 0.5
+# Batch DOI processing: DOIs resolved/downloaded at once, PDFs per bulk
+# ingest request, and the largest accepted batch
+DOI_BATCH_CONCURRENCY = 8
+DOI_BULK_INGEST_SIZE = 20
+DOI_BATCH_MAX_SIZE = 500
+# Background job queue: worker count, attempts per job, and the retry
+# backoff (doubling from JOB_RETRY_BACKOFF up to JOB_RETRY_BACKOFF_MAX seconds)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BACKOFF = 5.0
+JOB_RETRY_BACKOFF_MAX = 300.0
+# Chat history entries returned per page by default, and at most
+CHAT_HISTORY_PAGE_SIZE = 50
+CHAT_HISTORY_MAX_PAGE_SIZE = 200
+# Results returned by /search per section by default, and at most
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+# Seconds between keep-alive comments on idle /events streams, and how long
+# one stream stays open before the client is asked to reconnect (the server
+# waits for open streams on shutdown, so they must not live forever)
+SSE_KEEPALIVE_INTERVAL = 15.0
+SSE_MAX_STREAM_DURATION = 300.0
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 DOWNLOAD_FOLDER = Path("../Media")
-DOWNLOAD_FOLDER.mkdir(exist_ok=True)
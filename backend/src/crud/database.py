@@ -0,0 +1,99 @@
+import queue
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+
+from src.metrics import time_outbound
+
+T = TypeVar("T")
+
+
+class Database:
+    """A small pool of long-lived SQLite connections.
+
+    Connections are opened once in WAL mode and handed out to worker threads,
+    so route handlers never block the event loop on SQLite and never pay for
+    opening a connection per query. Each connection keeps its own cache of
+    prepared statements, which is why callers should use constant SQL strings
+    with `?` placeholders.
+    """
+
+    def __init__(self, path: Path, pool_size: int = 8, busy_timeout: float = 5.0):
+        self.path = path
+        self.pool_size = pool_size
+        self.busy_timeout = busy_timeout
+        self._pool: queue.LifoQueue[sqlite3.Connection] | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def open(self) -> None:
+        if self._pool is not None:
+            return
+        self._pool = queue.LifoQueue(maxsize=self.pool_size)
+        for _ in range(self.pool_size):
+            self._pool.put(self._connect())
+
+    def close(self) -> None:
+        if self._pool is None:
+            return
+        pool, self._pool = self._pool, None
+        while not pool.empty():
+            pool.get_nowait().close()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection; commit on success, roll back on error."""
+        if self._pool is None:
+            raise RuntimeError("Database pool is not open")
+        conn = self._pool.get()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+
+    def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self.connection() as conn:
+            return fn(conn, *args)
+
+    async def run(
+        self, fn: Callable[..., T], *args: Any, operation: str | None = None
+    ) -> T:
+        """Run `fn(conn, *args)` on a pooled connection in a worker thread.
+
+        The time it takes, waiting for a thread and a connection included,
+        is recorded under `operation` (the function's name by default).
+        """
+        with time_outbound("sqlite", operation or fn.__name__):
+            return await run_in_threadpool(self._run, fn, *args)
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        return await self.run(
+            lambda conn: conn.execute(sql, params), operation="execute"
+        )
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> tuple | None:
+        return await self.run(
+            lambda conn: conn.execute(sql, params).fetchone(), operation="fetchone"
+        )
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> list[tuple]:
+        return await self.run(
+            lambda conn: conn.execute(sql, params).fetchall(), operation="fetchall"
+        )
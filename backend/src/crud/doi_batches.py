@@ -0,0 +1,75 @@
+import sqlite3
+
+from src.crud.database import Database
+
+
+def create_doi_batch_tables(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS doi_batches (
+            id TEXT PRIMARY KEY,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS doi_batch_items (
+            batch_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            doi TEXT NOT NULL,
+            status TEXT NOT NULL,
+            filename TEXT,
+            error TEXT,
+            PRIMARY KEY (batch_id, position),
+            FOREIGN KEY (batch_id) REFERENCES doi_batches(id)
+        )
+    """
+    )
+
+
+def _create_batch(conn: sqlite3.Connection, batch_id: str, dois: list[str]):
+    conn.execute("INSERT INTO doi_batches (id) VALUES (?)", (batch_id,))
+    conn.executemany(
+        """
+        INSERT INTO doi_batch_items (batch_id, position, doi, status)
+        VALUES (?, ?, ?, 'pending')
+        """,
+        [(batch_id, position, doi) for position, doi in enumerate(dois)],
+    )
+
+
+async def create_batch(db: Database, batch_id: str, dois: list[str]):
+    await db.run(_create_batch, batch_id, dois)
+
+
+async def set_batch_item(
+    db: Database,
+    batch_id: str,
+    doi: str,
+    status: str,
+    filename: str | None = None,
+    error: str | None = None,
+):
+    await db.execute(
+        """
+        UPDATE doi_batch_items
+        SET status = ?, filename = COALESCE(?, filename), error = ?
+        WHERE batch_id = ? AND doi = ?
+        """,
+        (status, filename, error, batch_id, doi),
+    )
+
+
+async def get_batch_items(db: Database, batch_id: str) -> list[dict]:
+    rows = await db.fetchall(
+        """
+        SELECT doi, status, filename, error FROM doi_batch_items
+        WHERE batch_id = ? ORDER BY position
+        """,
+        (batch_id,),
+    )
+    return [
+        {"doi": row[0], "status": row[1], "filename": row[2], "error": row[3]}
+        for row in rows
+    ]
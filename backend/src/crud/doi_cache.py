@@ -0,0 +1,51 @@
+import sqlite3
+
+from src.crud.database import Database
+
+
+def create_doi_cache_table(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS doi_cache (
+            doi TEXT PRIMARY KEY,
+            landing_html TEXT,
+            pdf_url TEXT,
+            pdf_path TEXT,
+            etag TEXT,
+            fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+
+async def get_doi_cache(db: Database, doi: str):
+    row = await db.fetchone(
+        "SELECT landing_html, pdf_url, pdf_path, etag FROM doi_cache WHERE doi = ?",
+        (doi,),
+    )
+    if row is None:
+        return None
+    return {"landing_html": row[0], "pdf_url": row[1], "pdf_path": row[2], "etag": row[3]}
+
+
+async def set_doi_cache(
+    db: Database,
+    doi: str,
+    landing_html: str | None,
+    pdf_url: str | None = None,
+    pdf_path: str | None = None,
+    etag: str | None = None,
+):
+    await db.execute(
+        """
+        INSERT INTO doi_cache (doi, landing_html, pdf_url, pdf_path, etag)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (doi) DO UPDATE SET
+            landing_html = excluded.landing_html,
+            pdf_url = excluded.pdf_url,
+            pdf_path = excluded.pdf_path,
+            etag = excluded.etag,
+            fetched_at = CURRENT_TIMESTAMP
+        """,
+        (doi, landing_html, pdf_url, pdf_path, etag),
+    )
@@ -0,0 +1,164 @@
+import json
+import sqlite3
+import time
+
+from src.crud.database import Database
+
+
+def create_jobs_table(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            idempotency_key TEXT UNIQUE,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            run_after REAL NOT NULL,
+            last_error TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs (status, run_after)"
+    )
+
+
+def _job_from_row(row: tuple) -> dict:
+    return {
+        "id": row[0],
+        "kind": row[1],
+        "payload": json.loads(row[2]),
+        "status": row[3],
+        "attempts": row[4],
+        "max_attempts": row[5],
+        "last_error": row[6],
+    }
+
+
+_JOB_COLUMNS = "id, kind, payload, status, attempts, max_attempts, last_error"
+
+
+def _enqueue_job(
+    conn: sqlite3.Connection,
+    kind: str,
+    payload: str,
+    idempotency_key: str | None,
+    max_attempts: int,
+    rerun_done: bool,
+) -> int:
+    # A job with the same key is reused; only a failed one is run again,
+    # or a done one if the caller knows its result is gone
+    conn.execute(
+        """
+        INSERT INTO jobs (kind, payload, idempotency_key, status, max_attempts, run_after)
+        VALUES (?, ?, ?, 'queued', ?, ?)
+        ON CONFLICT (idempotency_key) DO UPDATE SET
+            payload = excluded.payload,
+            status = 'queued',
+            attempts = 0,
+            max_attempts = excluded.max_attempts,
+            run_after = excluded.run_after,
+            last_error = NULL,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE jobs.status = 'failed' OR (? AND jobs.status = 'done')
+        """,
+        (kind, payload, idempotency_key, max_attempts, time.time(), rerun_done),
+    )
+    if idempotency_key is None:
+        return conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return conn.execute(
+        "SELECT id FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+    ).fetchone()[0]
+
+
+async def enqueue_job(
+    db: Database,
+    kind: str,
+    payload: dict,
+    idempotency_key: str | None,
+    max_attempts: int,
+    rerun_done: bool = False,
+) -> int:
+    return await db.run(
+        _enqueue_job,
+        kind,
+        json.dumps(payload),
+        idempotency_key,
+        max_attempts,
+        rerun_done,
+    )
+
+
+async def claim_job(db: Database) -> dict | None:
+    """Atomically move the next due job to 'running' and return it."""
+    row = await db.fetchone(
+        f"""
+        UPDATE jobs
+        SET status = 'running', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+        WHERE id = (
+            SELECT id FROM jobs
+            WHERE status = 'queued' AND run_after <= ?
+            ORDER BY run_after, id
+            LIMIT 1
+        )
+        RETURNING {_JOB_COLUMNS}
+        """,
+        (time.time(),),
+    )
+    return _job_from_row(row) if row else None
+
+
+async def finish_job(db: Database, job_id: int):
+    await db.execute(
+        """
+        UPDATE jobs SET status = 'done', last_error = NULL, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+        """,
+        (job_id,),
+    )
+
+
+async def retry_job(db: Database, job_id: int, delay: float, error: str):
+    await db.execute(
+        """
+        UPDATE jobs SET status = 'queued', run_after = ?, last_error = ?,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+        """,
+        (time.time() + delay, error, job_id),
+    )
+
+
+async def fail_job(db: Database, job_id: int, error: str):
+    await db.execute(
+        """
+        UPDATE jobs SET status = 'failed', last_error = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+        """,
+        (error, job_id),
+    )
+
+
+async def requeue_running_jobs(db: Database):
+    """Put jobs interrupted by a shutdown or crash back in the queue."""
+    await db.execute(
+        """
+        UPDATE jobs SET status = 'queued', updated_at = CURRENT_TIMESTAMP
+        WHERE status = 'running'
+        """
+    )
+
+
+async def get_job(db: Database, job_id: int) -> dict | None:
+    row = await db.fetchone(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,))
+    return _job_from_row(row) if row else None
+
+
+async def count_jobs_by_status(db: Database) -> dict[str, int]:
+    rows = await db.fetchall("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+    return dict(rows)
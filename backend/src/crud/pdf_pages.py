@@ -0,0 +1,62 @@
+import sqlite3
+
+from src.crud.database import Database
+
+
+def create_pdf_pages_tables(conn: sqlite3.Connection):
+    # pdf_extractions marks a finished extraction, so a PDF whose pages are
+    # all empty is not parsed again either
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pdf_extractions (
+            content_hash TEXT PRIMARY KEY,
+            page_count INTEGER NOT NULL,
+            extracted_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pdf_pages (
+            content_hash TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            PRIMARY KEY (content_hash, page)
+        )
+    """)
+
+
+def _get_pdf_pages(conn: sqlite3.Connection, content_hash: str) -> list[str] | None:
+    extracted = conn.execute(
+        "SELECT 1 FROM pdf_extractions WHERE content_hash = ?", (content_hash,)
+    ).fetchone()
+    if extracted is None:
+        return None
+    rows = conn.execute(
+        "SELECT text FROM pdf_pages WHERE content_hash = ? ORDER BY page",
+        (content_hash,),
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+async def get_pdf_pages(db: Database, content_hash: str) -> list[str] | None:
+    """Return the cached text of every page, or None if not extracted yet."""
+    return await db.run(_get_pdf_pages, content_hash)
+
+
+def _set_pdf_pages(conn: sqlite3.Connection, content_hash: str, pages: list[str]):
+    conn.execute("DELETE FROM pdf_pages WHERE content_hash = ?", (content_hash,))
+    conn.executemany(
+        "INSERT INTO pdf_pages (content_hash, page, text) VALUES (?, ?, ?)",
+        ((content_hash, number, text) for number, text in enumerate(pages)),
+    )
+    conn.execute(
+        """
+        INSERT INTO pdf_extractions (content_hash, page_count) VALUES (?, ?)
+        ON CONFLICT (content_hash) DO UPDATE SET
+            page_count = excluded.page_count,
+            extracted_at = CURRENT_TIMESTAMP
+        """,
+        (content_hash, len(pages)),
+    )
+
+
+async def set_pdf_pages(db: Database, content_hash: str, pages: list[str]):
+    await db.run(_set_pdf_pages, content_hash, pages)
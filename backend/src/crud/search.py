@@ -0,0 +1,176 @@
+import html
+import re
+import sqlite3
+
+from src.crud.database import Database
+
+_WORD = re.compile(r"\w+")
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# FTS5 wraps matches in these control characters, which HTML escaping leaves
+# alone; they become the tags above once the text is escaped
+_MATCH_START = "\x02"
+_MATCH_END = "\x03"
+
+
+def _highlighted(text: str) -> str:
+    """Escape stored text as HTML, then mark the matches in it."""
+    return (
+        html.escape(text)
+        .replace(_MATCH_START, HIGHLIGHT_START)
+        .replace(_MATCH_END, HIGHLIGHT_END)
+    )
+
+
+def create_search_index(conn: sqlite3.Connection):
+    """FTS5 indexes over chat turns and extracted page text.
+
+    Both are external-content tables: the text lives only in the source
+    table, and triggers keep the index in step with every insert, update
+    and delete.
+    """
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS conversation_fts USING fts5(
+            question, answer,
+            content='conversation_history', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+    """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS conversation_fts_insert
+        AFTER INSERT ON conversation_history BEGIN
+            INSERT INTO conversation_fts (rowid, question, answer)
+            VALUES (new.id, new.question, new.answer);
+        END
+    """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS conversation_fts_delete
+        AFTER DELETE ON conversation_history BEGIN
+            INSERT INTO conversation_fts (conversation_fts, rowid, question, answer)
+            VALUES ('delete', old.id, old.question, old.answer);
+        END
+    """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS conversation_fts_update
+        AFTER UPDATE ON conversation_history BEGIN
+            INSERT INTO conversation_fts (conversation_fts, rowid, question, answer)
+            VALUES ('delete', old.id, old.question, old.answer);
+            INSERT INTO conversation_fts (rowid, question, answer)
+            VALUES (new.id, new.question, new.answer);
+        END
+    """
+    )
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS pdf_pages_fts USING fts5(
+            text,
+            content='pdf_pages', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+    """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS pdf_pages_fts_insert
+        AFTER INSERT ON pdf_pages BEGIN
+            INSERT INTO pdf_pages_fts (rowid, text) VALUES (new.id, new.text);
+        END
+    """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS pdf_pages_fts_delete
+        AFTER DELETE ON pdf_pages BEGIN
+            INSERT INTO pdf_pages_fts (pdf_pages_fts, rowid, text)
+            VALUES ('delete', old.id, old.text);
+        END
+    """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS pdf_pages_fts_update
+        AFTER UPDATE ON pdf_pages BEGIN
+            INSERT INTO pdf_pages_fts (pdf_pages_fts, rowid, text)
+            VALUES ('delete', old.id, old.text);
+            INSERT INTO pdf_pages_fts (rowid, text) VALUES (new.id, new.text);
+        END
+    """
+    )
+    # Index whatever the tables already hold
+    conn.execute("INSERT INTO conversation_fts (conversation_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO pdf_pages_fts (pdf_pages_fts) VALUES ('rebuild')")
+
+
+def to_fts_query(text: str) -> str | None:
+    """Turn free text into an FTS5 query matching all of its words.
+
+    Every word is quoted, so user input can never be parsed as FTS5 syntax.
+    """
+    words = _WORD.findall(text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+
+async def search_conversations(db: Database, query: str, limit: int) -> list[dict]:
+    rows = await db.fetchall(
+        """
+        SELECT ch.id, fm.filename, ch.timestamp,
+            highlight(conversation_fts, 0, ?, ?),
+            snippet(conversation_fts, 1, ?, ?, '…', 24),
+            bm25(conversation_fts) AS score
+        FROM conversation_fts
+        JOIN conversation_history ch ON ch.id = conversation_fts.rowid
+        JOIN file_gpt_map fm ON fm.id = ch.file_id
+        WHERE conversation_fts MATCH ?
+        ORDER BY score
+        LIMIT ?
+        """,
+        (_MATCH_START, _MATCH_END, _MATCH_START, _MATCH_END, query, limit),
+    )
+    return [
+        {
+            "id": row[0],
+            "filename": row[1],
+            "timestamp": row[2],
+            "question": _highlighted(row[3]),
+            "answer": _highlighted(row[4]),
+            "score": row[5],
+        }
+        for row in rows
+    ]
+
+
+async def search_pages(db: Database, query: str, limit: int) -> list[dict]:
+    rows = await db.fetchall(
+        """
+        SELECT fm.filename, pp.page,
+            snippet(pdf_pages_fts, 0, ?, ?, '…', 24),
+            bm25(pdf_pages_fts) AS score
+        FROM pdf_pages_fts
+        JOIN pdf_pages pp ON pp.id = pdf_pages_fts.rowid
+        JOIN file_gpt_map fm ON fm.content_hash = pp.content_hash
+        WHERE pdf_pages_fts MATCH ?
+        ORDER BY score
+        LIMIT ?
+        """,
+        (_MATCH_START, _MATCH_END, query, limit),
+    )
+    return [
+        # Pages are numbered from 1 for people
+        {
+            "filename": row[0],
+            "page": row[1] + 1,
+            "snippet": _highlighted(row[2]),
+            "score": row[3],
+        }
+        for row in rows
+    ]
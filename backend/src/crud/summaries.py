@@ -0,0 +1,90 @@
+import sqlite3
+
+from src.crud.database import Database
+
+
+def create_summaries_table(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS summaries (
+            content_hash TEXT NOT NULL,
+            prompt_version TEXT NOT NULL,
+            status TEXT NOT NULL,
+            summary TEXT,
+            error TEXT,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (content_hash, prompt_version)
+        )
+    """
+    )
+
+
+async def get_summary(db: Database, content_hash: str, prompt_version: str):
+    row = await db.fetchone(
+        """
+        SELECT status, summary, error, updated_at FROM summaries
+        WHERE content_hash = ? AND prompt_version = ?
+        """,
+        (content_hash, prompt_version),
+    )
+    if row is None:
+        return None
+    return {"status": row[0], "summary": row[1], "error": row[2], "updated_at": row[3]}
+
+
+async def set_summary_status(
+    db: Database,
+    content_hash: str,
+    prompt_version: str,
+    status: str,
+    summary: str | None = None,
+    error: str | None = None,
+):
+    await db.execute(
+        """
+        INSERT INTO summaries (content_hash, prompt_version, status, summary, error)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (content_hash, prompt_version) DO UPDATE SET
+            status = excluded.status,
+            summary = excluded.summary,
+            error = excluded.error,
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (content_hash, prompt_version, status, summary, error),
+    )
+
+
+async def fail_unfinished_summaries(db: Database, error: str):
+    """Mark jobs that were queued or running when the process stopped."""
+    await db.execute(
+        """
+        UPDATE summaries SET status = 'failed', error = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE status IN ('queued', 'running')
+        """,
+        (error,),
+    )
+
+
+def create_summary_chunks_table(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS summary_chunks (
+            chunk_hash TEXT PRIMARY KEY,
+            summary TEXT NOT NULL
+        )
+    """
+    )
+
+
+async def get_chunk_summary(db: Database, chunk_hash: str) -> str | None:
+    row = await db.fetchone(
+        "SELECT summary FROM summary_chunks WHERE chunk_hash = ?", (chunk_hash,)
+    )
+    return row[0] if row else None
+
+
+async def set_chunk_summary(db: Database, chunk_hash: str, summary: str):
+    await db.execute(
+        "INSERT OR REPLACE INTO summary_chunks (chunk_hash, summary) VALUES (?, ?)",
+        (chunk_hash, summary),
+    )
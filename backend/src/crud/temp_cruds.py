@@ -1,13 +1,18 @@
 from fastapi import HTTPException
+import json
 import sqlite3
 
-from src.consts import DB_PATH
+from src.crud.database import Database
+from src.crud.doi_batches import create_doi_batch_tables
+from src.crud.doi_cache import create_doi_cache_table
+from src.crud.jobs import create_jobs_table
+from src.crud.pdf_pages import create_pdf_pages_tables
+from src.crud.search import create_search_index
+from src.crud.summaries import create_summaries_table, create_summary_chunks_table
 
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
+def _create_schema(conn: sqlite3.Connection):
+    conn.execute(
         """
         CREATE TABLE IF NOT EXISTS file_gpt_map (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -16,34 +21,174 @@ def init_db():
         )
     """
     )
-    conn.commit()
-    conn.close()
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS conversation_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_id INTEGER NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (file_id) REFERENCES file_gpt_map(id)
+        )
+    """
+    )
+    create_summaries_table(conn)
+    create_summary_chunks_table(conn)
+    create_doi_cache_table(conn)
+    create_doi_batch_tables(conn)
+    create_jobs_table(conn)
+    create_pdf_pages_tables(conn)
 
 
-def insert_mapping(filename: str, doc_id: str):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "INSERT INTO file_gpt_map (filename, doc_id) VALUES (?, ?)",
-            (filename, doc_id),
+def _add_content_hash(conn: sqlite3.Connection):
+    conn.execute("ALTER TABLE file_gpt_map ADD COLUMN content_hash TEXT")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_file_gpt_map_content_hash "
+        "ON file_gpt_map (content_hash)"
+    )
+
+
+def _cascade_conversation_history(conn: sqlite3.Connection):
+    # SQLite cannot alter a foreign key in place, so the table is rebuilt.
+    # Rows of files that no longer exist are dropped on the way.
+    conn.execute(
+        """
+        CREATE TABLE conversation_history_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_id INTEGER NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (file_id) REFERENCES file_gpt_map(id) ON DELETE CASCADE
+        )
+    """
+    )
+    conn.execute(
+        """
+        INSERT INTO conversation_history_new (id, file_id, question, answer, timestamp)
+        SELECT id, file_id, question, answer, timestamp FROM conversation_history
+        WHERE file_id IN (SELECT id FROM file_gpt_map)
+        """
+    )
+    conn.execute("DROP TABLE conversation_history")
+    conn.execute("ALTER TABLE conversation_history_new RENAME TO conversation_history")
+    # Serves both the per-file lookup and the keyset pagination on id
+    conn.execute(
+        "CREATE INDEX idx_conversation_history_file_id "
+        "ON conversation_history (file_id, id)"
+    )
+
+
+def _add_search_index(conn: sqlite3.Connection):
+    # The page index needs a stable integer key to point at; a table's
+    # implicit rowid may be renumbered by VACUUM, so pdf_pages gets a real one
+    conn.execute(
+        """
+        CREATE TABLE pdf_pages_new (
+            id INTEGER PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            UNIQUE (content_hash, page)
         )
+    """
+    )
+    conn.execute(
+        """
+        INSERT INTO pdf_pages_new (content_hash, page, text)
+        SELECT content_hash, page, text FROM pdf_pages
+        """
+    )
+    conn.execute("DROP TABLE pdf_pages")
+    conn.execute("ALTER TABLE pdf_pages_new RENAME TO pdf_pages")
+    create_search_index(conn)
+
+
+def _add_file_docs(conn: sqlite3.Connection):
+    # A file is ingested as several documents (one per PDF page) and the
+    # mapping keeps only the first; these are all of them
+    conn.execute(
+        """
+        CREATE TABLE file_docs (
+            file_id INTEGER NOT NULL REFERENCES file_gpt_map(id) ON DELETE CASCADE,
+            doc_id TEXT NOT NULL,
+            PRIMARY KEY (file_id, doc_id)
+        ) WITHOUT ROWID
+    """
+    )
+
+
+# Applied in order on top of _create_schema; PRAGMA user_version records how
+# many have run. Only ever append to this list.
+MIGRATIONS = [
+    _add_content_hash,
+    _cascade_conversation_history,
+    _add_search_index,
+    _add_file_docs,
+]
+
+
+def _migrate(conn: sqlite3.Connection):
+    _create_schema(conn)
+    conn.commit()
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        # A migration and its version bump commit together, so a crash halfway
+        # leaves the schema as the previous version had it. DDL does not open
+        # a transaction by itself, hence the explicit one.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+        except BaseException:
+            conn.rollback()
+            raise
         conn.commit()
+
+
+async def init_db(db: Database):
+    await db.run(_migrate)
+
+
+def _insert_mapping(
+    conn: sqlite3.Connection,
+    filename: str,
+    doc_id: str,
+    content_hash: str | None,
+    doc_ids: list[str] | None,
+):
+    file_id = conn.execute(
+        "INSERT INTO file_gpt_map (filename, doc_id, content_hash) VALUES (?, ?, ?)",
+        (filename, doc_id, content_hash),
+    ).lastrowid
+    conn.executemany(
+        "INSERT OR IGNORE INTO file_docs (file_id, doc_id) VALUES (?, ?)",
+        [(file_id, id_) for id_ in [doc_id, *(doc_ids or [])]],
+    )
+
+
+async def insert_mapping(
+    db: Database,
+    filename: str,
+    doc_id: str,
+    content_hash: str | None = None,
+    doc_ids: list[str] | None = None,
+):
+    """Map `filename` to its first document `doc_id`, recording all `doc_ids`."""
+    try:
+        await db.run(_insert_mapping, filename, doc_id, content_hash, doc_ids)
     except sqlite3.IntegrityError:
         raise HTTPException(
             status_code=400, detail=f"File '{filename}' already exists in the database."
         )
-    finally:
-        conn.close()
 
 
 # Fetch a mapping from the database
-def get_mapping(filename: str):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT doc_id FROM file_gpt_map WHERE filename = ?", (filename,))
-    result = cursor.fetchone()
-    conn.close()
+async def get_mapping(db: Database, filename: str):
+    result = await db.fetchone(
+        "SELECT doc_id FROM file_gpt_map WHERE filename = ?", (filename,)
+    )
     if result:
         return result[0]
     else:
@@ -52,13 +197,124 @@ def get_mapping(filename: str):
         )
 
 
-def get_all_ingested():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM file_gpt_map")
-    result = cursor.fetchall()
-    conn.close()
+async def get_mapping_by_hash(db: Database, content_hash: str) -> tuple | None:
+    """Return (filename, doc_id) of a file already ingested with these bytes."""
+    return await db.fetchone(
+        "SELECT filename, doc_id FROM file_gpt_map WHERE content_hash = ? LIMIT 1",
+        (content_hash,),
+    )
+
+
+async def get_all_ingested(db: Database):
+    result = await db.fetchall("SELECT * FROM file_gpt_map")
     if result:
         return result
     else:
         raise HTTPException(status_code=404, detail=f"No files mapped")
+
+
+async def get_file_id(db: Database, filename: str) -> int | None:
+    result = await db.fetchone(
+        "SELECT id FROM file_gpt_map WHERE filename = ?", (filename,)
+    )
+    return result[0] if result else None
+
+
+async def insert_conversation(db: Database, filename: str, question: str, answer: str):
+    """Store a Q&A turn for `filename`; a no-op if the file is not mapped."""
+    await db.execute(
+        """
+        INSERT INTO conversation_history (file_id, question, answer)
+        SELECT id, ?, ? FROM file_gpt_map WHERE filename = ?
+        """,
+        (question, answer, filename),
+    )
+
+
+_MAX_ROWID = 2**63 - 1
+
+
+async def get_conversation_history(
+    db: Database, filename: str, limit: int, before: int | None = None
+) -> list[tuple]:
+    """Return up to `limit` (id, question, answer, timestamp) rows, newest first.
+
+    Keyset pagination: pass the smallest id of the previous page as `before`
+    to get the page preceding it.
+    """
+    return await db.fetchall(
+        """
+        SELECT ch.id, ch.question, ch.answer, ch.timestamp
+        FROM conversation_history ch
+        WHERE ch.file_id = (SELECT id FROM file_gpt_map WHERE filename = ?)
+          AND ch.id < ?
+        ORDER BY ch.id DESC
+        LIMIT ?
+        """,
+        (filename, before if before is not None else _MAX_ROWID, limit),
+    )
+
+
+async def rename_mapping(db: Database, filename: str, new_filename: str):
+    # conversation_history references file_gpt_map by id, so only the
+    # filename itself needs to change
+    await db.execute(
+        "UPDATE file_gpt_map SET filename = ? WHERE filename = ?",
+        (new_filename, filename),
+    )
+
+
+async def delete_mapping(db: Database, filename: str):
+    # The file's conversations go with it (ON DELETE CASCADE)
+    await db.execute("DELETE FROM file_gpt_map WHERE filename = ?", (filename,))
+
+
+async def get_mappings(db: Database, filenames: list[str]) -> list[tuple]:
+    """Return (filename, doc_id) for every mapped file among `filenames`."""
+    return await db.fetchall(
+        """
+        SELECT filename, doc_id FROM file_gpt_map
+        WHERE filename IN (SELECT value FROM json_each(?))
+        """,
+        (json.dumps(filenames),),
+    )
+
+
+async def get_file_doc_ids(db: Database, filenames: list[str]) -> dict[str, list[str]]:
+    """Return the recorded doc ids of every mapped file among `filenames`.
+
+    Files mapped before doc ids were recorded have none.
+    """
+    rows = await db.fetchall(
+        """
+        SELECT m.filename, d.doc_id FROM file_gpt_map m
+        LEFT JOIN file_docs d ON d.file_id = m.id
+        WHERE m.filename IN (SELECT value FROM json_each(?))
+        """,
+        (json.dumps(filenames),),
+    )
+    doc_ids: dict[str, list[str]] = {}
+    for filename, doc_id in rows:
+        ids = doc_ids.setdefault(filename, [])
+        if doc_id is not None:
+            ids.append(doc_id)
+    return doc_ids
+
+
+async def delete_mappings(db: Database, filenames: list[str]):
+    await db.execute(
+        "DELETE FROM file_gpt_map WHERE filename IN (SELECT value FROM json_each(?))",
+        (json.dumps(filenames),),
+    )
+
+
+def _delete_all_mappings(conn: sqlite3.Connection):
+    # Clearing the child table first is a single truncate instead of a
+    # cascade per file
+    conn.execute("DELETE FROM conversation_history")
+    conn.execute("DELETE FROM file_docs")
+    conn.execute("DELETE FROM file_gpt_map")
+
+
+async def delete_all_mappings(db: Database):
+    await db.run(_delete_all_mappings)
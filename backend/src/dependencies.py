@@ -1,4 +1,97 @@
-from pgpt_python.client import PrivateGPTApi
+from functools import partial
+from operator import itemgetter
 
-summary_store = {}
-pgpt_client = PrivateGPTApi(base_url="http://localhost:8001")
+from src.api_.clients.http import HttpSession
+from src.api_.clients.llm_client import LLMClient
+from src.api_.clients.scihub import SciHubApi
+from src.consts import (
+    ANSWER_CACHE_FINGERPRINT,
+    ANSWER_CACHE_SIMILARITY,
+    ANSWER_CACHE_SIZE,
+    ANSWER_CACHE_TTL,
+    DB_PATH,
+    DB_POOL_SIZE,
+    DOC_REGISTRY_RECONCILE_INTERVAL,
+    EXTRACTION_PAGES_PER_TASK,
+    EXTRACTION_WORKERS,
+    HTTP_LIMIT_PER_HOST,
+    HTTP_MIN_INTERVAL_PER_HOST,
+    JOB_MAX_ATTEMPTS,
+    JOB_RETRY_BACKOFF,
+    JOB_RETRY_BACKOFF_MAX,
+    JOB_WORKERS,
+    LLM_CLIENT_INGEST_TIMEOUT,
+    LLM_CLIENT_MAX_CONCURRENCY,
+    LLM_CLIENT_MAX_CONNECTIONS,
+    LLM_CLIENT_TIMEOUT,
+    LLM_CLIENT_URL,
+    SCIHUB_URL,
+    SUMMARY_CONCURRENCY,
+)
+from src.crud.database import Database
+from src.services.answer_cache import AnswerCache
+from src.services.doc_registry import DocRegistry
+from src.services.doi_batch import run_doi_batch
+from src.services.events import EventBus
+from src.services.extraction import PdfExtractor
+from src.services.job_queue import JobQueue
+from src.services.summarization import ingest_file_and_store
+from src.services.summary_jobs import SummaryJobs
+
+llm_client = LLMClient(
+    base_url=LLM_CLIENT_URL,
+    max_connections=LLM_CLIENT_MAX_CONNECTIONS,
+    max_concurrency=LLM_CLIENT_MAX_CONCURRENCY,
+    timeout=LLM_CLIENT_TIMEOUT,
+    ingest_timeout=LLM_CLIENT_INGEST_TIMEOUT,
+)
+db = Database(DB_PATH, pool_size=DB_POOL_SIZE)
+http_session = HttpSession(
+    limit_per_host=HTTP_LIMIT_PER_HOST,
+    min_interval_per_host=HTTP_MIN_INTERVAL_PER_HOST,
+)
+scihub = SciHubApi(http_session, SCIHUB_URL)
+events = EventBus()
+pdf_extractor = PdfExtractor(
+    max_workers=EXTRACTION_WORKERS, pages_per_task=EXTRACTION_PAGES_PER_TASK
+)
+summary_jobs = SummaryJobs(
+    max_concurrency=SUMMARY_CONCURRENCY, events=events, extractor=pdf_extractor
+)
+doc_registry = DocRegistry(reconcile_interval=DOC_REGISTRY_RECONCILE_INTERVAL)
+answer_cache = AnswerCache(
+    max_entries=ANSWER_CACHE_SIZE,
+    ttl=ANSWER_CACHE_TTL,
+    fingerprint=ANSWER_CACHE_FINGERPRINT,
+    similarity_threshold=ANSWER_CACHE_SIMILARITY,
+)
+doc_registry.on_change(answer_cache.invalidate)
+job_queue = JobQueue(
+    events=events,
+    workers=JOB_WORKERS,
+    max_attempts=JOB_MAX_ATTEMPTS,
+    backoff=JOB_RETRY_BACKOFF,
+    backoff_max=JOB_RETRY_BACKOFF_MAX,
+)
+job_queue.register(
+    "ingest_file",
+    partial(ingest_file_and_store, llm_client, db, doc_registry, pdf_extractor),
+    topic=itemgetter("filename"),
+)
+job_queue.register(
+    "doi_batch",
+    partial(
+        run_doi_batch,
+        scihub,
+        http_session,
+        llm_client,
+        db,
+        doc_registry,
+        pdf_extractor,
+    ),
+    topic=itemgetter("batch_id"),
+)
+
+
+def get_db() -> Database:
+    return db
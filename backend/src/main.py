@@ -1,61 +1,75 @@
-import os
+import logging
+from contextlib import asynccontextmanager
 
-from bs4 import BeautifulSoup
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi import File, UploadFile, Form
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pathlib import Path
-import aiohttp
-import fitz  # PyMuPDF
-from src.api_.clients.scihub import SciHubApi
-from pgpt_python.client import PrivateGPTApi
-import sqlite3
 
-from src.consts import DB_PATH, DOWNLOAD_FOLDER
+from src.consts import DOWNLOAD_FOLDER, LOG_LEVEL
 from src.api_.routers.main import router
 from src.api_.routers.conversation import router as conversation_router
-from src.dependencies import pgpt_client
+from src.api_.routers.metrics import router as metrics_router
+from src.crud.temp_cruds import init_db
+from src.metrics import MetricsMiddleware
+from src.dependencies import (
+    db,
+    doc_registry,
+    http_session,
+    events,
+    job_queue,
+    llm_client,
+    pdf_extractor,
+    summary_jobs,
+)
 
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS file_gpt_map (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            filename TEXT UNIQUE NOT NULL,
-            doc_id TEXT NOT NULL
-        )
-    """
-    )
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS conversation_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            file_id INTEGER NOT NULL,
-            question TEXT NOT NULL,
-            answer TEXT NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (file_id) REFERENCES file_gpt_map(id)
-        )
-    """
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Everything with side effects happens here rather than at import time
+    logging.basicConfig(
+        level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
     )
-    conn.commit()
-    conn.close()
-
-
-init_db()
+    # httpx logs every request at INFO, which would drown everything else
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    DOWNLOAD_FOLDER.mkdir(exist_ok=True)
+    db.open()
+    await llm_client.start()
+    await http_session.start()
+    await init_db(db)
+    pdf_extractor.start()
+    await summary_jobs.recover(db)
+    doc_registry.start(llm_client)
+    await job_queue.start(db)
+    try:
+        yield
+    finally:
+        events.close()
+        await job_queue.stop()
+        await doc_registry.stop()
+        await summary_jobs.shutdown()
+        pdf_extractor.close()
+        await llm_client.close()
+        await http_session.close()
+        db.close()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],  # for frontend
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # The PDF viewer only lazy-loads by range if it can see these
+    expose_headers=[
+        "X-Next-Before",
+        "Accept-Ranges",
+        "Content-Range",
+        "Content-Length",
+        "ETag",
+    ],
 )
+# Added last so it is outermost and times the whole request, CORS included
+app.add_middleware(MetricsMiddleware)
 app.include_router(router=router)
 app.include_router(router=conversation_router)
+app.include_router(router=metrics_router)
@@ -0,0 +1,122 @@
+"""Metrics the backend records, exposed in the Prometheus format on /metrics.
+
+They live in prometheus_client's default registry, next to its process
+and runtime collectors.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# prometheus_client's defaults stop at 10s; LLM calls and jobs take longer
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)  # fmt: skip
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests handled, by route template and status.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ("method", "route"),
+    buckets=DEFAULT_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled, open event streams included.",
+    ("method", "route"),
+)
+OUTBOUND_DURATION = Histogram(
+    "outbound_request_duration_seconds",
+    "Time spent in calls to the llm_client, Sci-Hub, PDF mirrors and SQLite.",
+    ("target", "operation"),
+    buckets=DEFAULT_BUCKETS,
+)
+OUTBOUND_ERRORS = Counter(
+    "outbound_request_errors_total",
+    "Calls to the llm_client, Sci-Hub, PDF mirrors and SQLite that raised.",
+    ("target", "operation"),
+)
+JOB_QUEUE_DEPTH = Gauge(
+    "job_queue_depth",
+    "Background jobs in the jobs table, by status.",
+    ("status",),
+)
+JOB_DURATION = Histogram(
+    "job_duration_seconds",
+    "Run time of one background job attempt, by kind and outcome.",
+    ("kind", "outcome"),
+    buckets=DEFAULT_BUCKETS,
+)
+
+
+@contextmanager
+def time_outbound(target: str, operation: str) -> Iterator[None]:
+    """Record the duration of an outbound call, and count it if it fails.
+
+    A call that is cancelled or closed early is timed but not counted.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        OUTBOUND_ERRORS.labels(target=target, operation=operation).inc()
+        raise
+    finally:
+        OUTBOUND_DURATION.labels(target=target, operation=operation).observe(
+            time.perf_counter() - started
+        )
+
+
+class MetricsMiddleware:
+    """Record per-route request counts, latencies and in-flight requests.
+
+    Requests are labelled with the route's path template (`/jobs/{job_id}`,
+    not `/jobs/42`) to keep the number of series bounded. It is plain ASGI
+    rather than BaseHTTPMiddleware so that a streamed response is timed
+    until its last chunk, not until its headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    @staticmethod
+    def _route(scope: Scope) -> str:
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        labels = {"method": scope["method"], "route": self._route(scope)}
+        status = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(**labels)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.labels(**labels).observe(
+                time.perf_counter() - started
+            )
+            HTTP_REQUESTS.labels(status=status, **labels).inc()
+            in_flight.dec()
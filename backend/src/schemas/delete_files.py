@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+
+class DeleteFilesSchema(BaseModel):
+    filenames: list[str]
@@ -0,0 +1,44 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+# The parts of the llm_client's responses the backend reads; other fields
+# are ignored
+
+
+class IngestedDoc(BaseModel):
+    doc_id: str
+    doc_metadata: dict[str, Any] | None = None
+
+
+class IngestResponse(BaseModel):
+    data: list[IngestedDoc]
+
+
+class Chunk(BaseModel):
+    document: IngestedDoc
+    text: str | None = None
+
+
+class Message(BaseModel):
+    role: str | None = None
+    content: str | None = None
+
+
+class Choice(BaseModel):
+    message: Message | None = None
+    delta: Message | None = None
+    sources: list[Chunk] | None = None
+    finish_reason: str | None = None
+
+
+class Completion(BaseModel):
+    choices: list[Choice]
+
+
+class Embedding(BaseModel):
+    embedding: list[float]
+
+
+class EmbeddingResponse(BaseModel):
+    data: list[Embedding]
@@ -3,3 +3,10 @@ from pydantic import BaseModel
 
 class ProcessDOISchema(BaseModel):
     doi: str
+    # Revalidate the cached PDF against its ETag instead of trusting it
+    refresh: bool = False
+
+
+class ProcessDOIBatchSchema(BaseModel):
+    dois: list[str]
+    refresh: bool = False
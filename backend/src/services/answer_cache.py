@@ -0,0 +1,130 @@
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+from src.api_.clients.llm_client import LLMClient
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case, spacing and trailing punctuation do not change the question."""
+    return _WHITESPACE.sub(" ", prompt).strip().rstrip("?!. ").lower()
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class AnswerCache:
+    """LRU cache of chat answers with a TTL.
+
+    Entries are keyed by (doc_id, normalized prompt, fingerprint), where the
+    fingerprint identifies the model and completion settings, so changing
+    either never serves an answer produced by the old ones. If
+    `similarity_threshold` is set, a miss falls back to comparing the
+    question's embedding with the cached questions for the same document,
+    and a close enough one counts as a hit.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        fingerprint: str,
+        similarity_threshold: float | None = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.fingerprint = fingerprint
+        self.similarity_threshold = similarity_threshold
+        # key -> (expires_at, answer, prompt embedding or None)
+        self._entries: OrderedDict[tuple, tuple] = OrderedDict()
+        self._embeddings: OrderedDict[str, list[float]] = OrderedDict()
+
+    def _key(self, doc_id: str, prompt: str) -> tuple:
+        return doc_id, normalize_prompt(prompt), self.fingerprint
+
+    async def _embedding(
+        self, llm_client: LLMClient, prompt: str
+    ) -> list[float] | None:
+        """Embed the question; None if the llm_client cannot, which only
+        turns the similarity lookup off for it."""
+        normalized = normalize_prompt(prompt)
+        embedding = self._embeddings.get(normalized)
+        if embedding is None:
+            try:
+                embedding = await llm_client.embed(normalized)
+            except Exception as e:
+                logger.warning("Could not embed the question: %s", e)
+                return None
+            self._embeddings[normalized] = embedding
+            if len(self._embeddings) > self.max_entries:
+                self._embeddings.popitem(last=False)
+        else:
+            self._embeddings.move_to_end(normalized)
+        return embedding
+
+    def _live(self, key: tuple) -> tuple | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def get(self, llm_client: LLMClient, doc_id: str, prompt: str) -> dict | None:
+        entry = self._live(self._key(doc_id, prompt))
+        if entry is not None:
+            return entry[1]
+        if self.similarity_threshold is None:
+            return None
+
+        embedding = await self._embedding(llm_client, prompt)
+        if embedding is None:
+            return None
+        best, best_score = None, self.similarity_threshold
+        for key in list(self._entries):
+            if key[0] != doc_id or key[2] != self.fingerprint:
+                continue
+            entry = self._live(key)
+            if entry is None or entry[2] is None:
+                continue
+            score = _cosine(embedding, entry[2])
+            if score >= best_score:
+                best, best_score = entry[1], score
+        return best
+
+    async def put(self, llm_client: LLMClient, doc_id: str, prompt: str, answer: dict):
+        embedding = None
+        if self.similarity_threshold is not None:
+            embedding = await self._embedding(llm_client, prompt)
+        key = self._key(doc_id, prompt)
+        self._entries[key] = (time.monotonic() + self.ttl, answer, embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, doc_ids: Iterable[str] | None):
+        """Forget every answer about these documents (deleted or re-ingested).
+
+        None forgets everything. Fits `DocRegistry.on_change`.
+        """
+        if doc_ids is None:
+            self.clear()
+            return
+        doc_ids = set(doc_ids)
+        for key in [key for key in self._entries if key[0] in doc_ids]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,69 @@
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+
+from src.api_.clients.llm_client import LLMClient
+from src.crud.database import Database
+from src.crud.temp_cruds import insert_conversation
+from src.services.answer_cache import AnswerCache
+from src.services.events import format_sse
+
+
+async def stream_chat_answer(
+    llm_client: LLMClient,
+    db: Database,
+    answer_cache: AnswerCache,
+    filename: str,
+    doc_id: str,
+    prompt: str,
+) -> AsyncIterator[str]:
+    """Proxy a streamed contextual completion as server-sent events.
+
+    Emits one "sources" event as soon as retrieval is done (the llm_client
+    attaches the sources to the first chunk), a "token" event per generated
+    piece of text, then "done" with the full answer. The conversation row is
+    written only once the answer is complete. A cached answer is sent the
+    same way, as a single token.
+    """
+    cached = await answer_cache.get(llm_client, doc_id, prompt)
+    if cached is not None:
+        await insert_conversation(db, filename, prompt, cached["response"])
+        yield format_sse({"type": "sources", "sources": cached["sources"]})
+        yield format_sse({"type": "token", "text": cached["response"]})
+        yield format_sse({"type": "done", "response": cached["response"]})
+        return
+
+    answer: list[str] = []
+    sources: list[str] = []
+    sources_sent = False
+    try:
+        async for chunk in llm_client.prompt_completion_stream(
+            prompt=prompt,
+            use_context=True,
+            context_filter={"docs_ids": [doc_id]},
+            include_sources=True,
+        ):
+            choice = chunk.choices[0]
+            if not sources_sent and choice.sources:
+                sources_sent = True
+                sources = [
+                    source.document.doc_metadata.get("file_name")
+                    for source in choice.sources
+                    if source.document.doc_metadata
+                ]
+                yield format_sse({"type": "sources", "sources": sources})
+            text = choice.delta.content if choice.delta else None
+            if text:
+                answer.append(text)
+                yield format_sse({"type": "token", "text": text})
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        yield format_sse({"type": "error", "detail": f"Error during chat: {detail}"})
+        return
+
+    response = "".join(answer)
+    await insert_conversation(db, filename, prompt, response)
+    await answer_cache.put(
+        llm_client, doc_id, prompt, {"response": response, "sources": sources}
+    )
+    yield format_sse({"type": "done", "response": response})
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Iterable
+
+from src.api_.clients.llm_client import LLMClient
+
+logger = logging.getLogger(__name__)
+
+# Called with the doc ids that were added or removed, or None for "all"
+ChangeHook = Callable[[set[str] | None], None]
+
+
+class DocRegistry:
+    """Local set of the doc ids the llm_client knows about.
+
+    It answers "is this document ingested?" without a `list_ingested()`
+    round trip. Ingest and delete paths keep it up to date, and a background
+    task reconciles it with the llm_client periodically to pick up changes
+    made elsewhere (another replica, the ingest script, the llm_client UI).
+    Hooks registered with `on_change` hear about every added or removed id,
+    so caches derived from a document can be dropped with it.
+    """
+
+    def __init__(self, reconcile_interval: float, miss_refresh_interval: float = 5.0):
+        self.reconcile_interval = reconcile_interval
+        self.miss_refresh_interval = miss_refresh_interval
+        self._doc_ids: set[str] = set()
+        self._last_reconcile: float | None = None
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._hooks: list[ChangeHook] = []
+
+    def on_change(self, hook: ChangeHook):
+        self._hooks.append(hook)
+
+    def _changed(self, doc_ids: set[str] | None):
+        for hook in self._hooks:
+            hook(doc_ids)
+
+    def add(self, doc_ids: Iterable[str]):
+        doc_ids = set(doc_ids)
+        self._doc_ids.update(doc_ids)
+        self._changed(doc_ids)
+
+    def discard(self, doc_ids: Iterable[str]):
+        doc_ids = set(doc_ids)
+        self._doc_ids.difference_update(doc_ids)
+        self._changed(doc_ids)
+
+    def clear(self):
+        self._doc_ids.clear()
+        self._changed(None)
+
+    def _is_fresh(self, max_age: float) -> bool:
+        return (
+            self._last_reconcile is not None
+            and time.monotonic() - self._last_reconcile <= max_age
+        )
+
+    async def reconcile(self, llm_client: LLMClient, max_age: float | None = None):
+        """Replace the local set with the llm_client's.
+
+        With `max_age`, skip it if the last one is at most that old, which
+        is checked again once the lock is held: callers that queued up
+        behind a reconciliation do not each run their own.
+        """
+        async with self._lock:
+            if max_age is not None and self._is_fresh(max_age):
+                return
+            docs = await llm_client.list_ingested()
+            doc_ids = {doc.doc_id for doc in docs}
+            changed = doc_ids ^ self._doc_ids
+            self._doc_ids = doc_ids
+            self._last_reconcile = time.monotonic()
+        if changed:
+            self._changed(changed)
+        logger.debug("Doc registry reconciled, %d documents", len(self._doc_ids))
+
+    async def contains(self, llm_client: LLMClient, doc_id: str) -> bool:
+        if doc_id in self._doc_ids:
+            return True
+        # A miss may just mean the document was ingested by someone else
+        # since the last reconciliation; re-check, but not on every miss
+        if not self._is_fresh(self.miss_refresh_interval):
+            await self.reconcile(llm_client, max_age=self.miss_refresh_interval)
+        return doc_id in self._doc_ids
+
+    async def _reconcile_forever(self, llm_client: LLMClient):
+        while True:
+            try:
+                await self.reconcile(llm_client)
+            except Exception:
+                logger.warning("Doc registry reconciliation failed", exc_info=True)
+            await asyncio.sleep(self.reconcile_interval)
+
+    def start(self, llm_client: LLMClient):
+        if self._task is None:
+            self._task = asyncio.create_task(self._reconcile_forever(llm_client))
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
@@ -0,0 +1,77 @@
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from fastapi import HTTPException
+
+from src.api_.clients.http import HttpSession
+from src.api_.clients.scihub import SciHubApi
+from src.crud.database import Database
+from src.crud.doi_cache import get_doi_cache, set_doi_cache
+from src.services.pdf import download_pdf
+
+
+def find_pdf_url(html_content: str, page_url: str) -> str | None:
+    # Imported on first use: bs4 is slow to import and only needed here
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, "html.parser")
+    embed_tag = soup.find("embed")
+    if embed_tag and "src" in embed_tag.attrs:
+        # Handles absolute, scheme-relative ("//host/x.pdf") and relative links
+        return urljoin(page_url, embed_tag["src"])
+    return None
+
+
+def pdf_filename_from_url(pdf_url: str) -> str:
+    return urlsplit(pdf_url).path.split("/")[-1]
+
+
+async def resolve_doi(
+    scihub: SciHubApi,
+    http: HttpSession,
+    db: Database,
+    doi: str,
+    refresh: bool = False,
+):
+    """Resolve a DOI to a local PDF, going to the network only when needed.
+
+    A DOI whose PDF is already on disk is served from the doi_cache table
+    with no request at all. With `refresh`, the cached PDF is revalidated
+    against its ETag and only downloaded again if it changed.
+
+    Returns a dict with the PDF path, its filename, its content hash (None
+    when the file was not downloaded by this call) and whether the cache
+    answered.
+    """
+    cached = await get_doi_cache(db, doi)
+    pdf_on_disk = bool(cached and cached["pdf_path"] and Path(cached["pdf_path"]).exists())
+    if pdf_on_disk and not refresh:
+        pdf_path = Path(cached["pdf_path"])
+        return {"file_path": pdf_path, "filename": pdf_path.name, "content_hash": None, "cached": True}
+
+    page_url = scihub.page_url(doi)
+    html_content = cached["landing_html"] if cached and not refresh else None
+    if not html_content:
+        _, html_content = await scihub.get_page(doi)
+        if not html_content:
+            raise HTTPException(status_code=500, detail="Empty response content")
+
+    pdf_url = find_pdf_url(html_content, page_url)
+    if pdf_url is None:
+        raise HTTPException(
+            status_code=404, detail="PDF download URL not found in the page content"
+        )
+
+    filename = pdf_filename_from_url(pdf_url)
+    etag = cached["etag"] if pdf_on_disk else None
+    file_path, content_hash, etag = await download_pdf(http, pdf_url, filename, etag=etag)
+    if file_path is None:
+        # 304 Not Modified, the cached copy is current
+        file_path = Path(cached["pdf_path"])
+    await set_doi_cache(db, doi, html_content, pdf_url, str(file_path), etag)
+    return {
+        "file_path": file_path,
+        "filename": file_path.name,
+        "content_hash": content_hash,
+        "cached": content_hash is None,
+    }
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+from pathlib import Path
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from src.api_.clients.http import HttpSession
+from src.api_.clients.llm_client import LLMClient
+from src.api_.clients.scihub import SciHubApi
+from src.consts import DOI_BATCH_CONCURRENCY, DOI_BULK_INGEST_SIZE
+from src.crud.database import Database
+from src.crud.doi_batches import set_batch_item
+from src.crud.temp_cruds import get_file_id, get_mapping_by_hash, insert_mapping
+from src.services.doc_registry import DocRegistry
+from src.services.doi import resolve_doi
+from src.services.extraction import PdfExtractor
+from src.services.helper import file_sha256
+from src.services.summarization import index_pages
+
+logger = logging.getLogger(__name__)
+
+
+async def _resolve_batch(
+    scihub: SciHubApi,
+    http: HttpSession,
+    db: Database,
+    batch_id: str,
+    dois: list[str],
+    refresh: bool,
+) -> dict[str, dict]:
+    """Resolve and download every DOI, at most DOI_BATCH_CONCURRENCY at once.
+
+    Returns the PDFs that still need ingesting, keyed by filename, each with
+    the DOIs that resolved to it.
+    """
+    semaphore = asyncio.Semaphore(DOI_BATCH_CONCURRENCY)
+    pending: dict[str, dict] = {}
+
+    async def resolve_one(doi: str):
+        async with semaphore:
+            await set_batch_item(db, batch_id, doi, "downloading")
+            try:
+                resolved = await resolve_doi(scihub, http, db, doi, refresh)
+            except HTTPException as e:
+                await set_batch_item(db, batch_id, doi, "failed", error=str(e.detail))
+                return
+            except Exception as e:
+                await set_batch_item(db, batch_id, doi, "failed", error=str(e))
+                return
+
+        filename = resolved["filename"]
+        content_hash = resolved["content_hash"]
+        already_ingested = await get_file_id(db, filename) is not None or (
+            content_hash is not None
+            and await get_mapping_by_hash(db, content_hash) is not None
+        )
+        if already_ingested:
+            await set_batch_item(db, batch_id, doi, "skipped", filename)
+            return
+
+        entry = pending.setdefault(
+            filename,
+            {"file_path": resolved["file_path"], "content_hash": content_hash, "dois": []},
+        )
+        entry["dois"].append(doi)
+        await set_batch_item(db, batch_id, doi, "downloaded", filename)
+
+    await asyncio.gather(*(resolve_one(doi) for doi in dois))
+    return pending
+
+
+async def _ingest_group(
+    llm_client: LLMClient,
+    db: Database,
+    doc_registry: DocRegistry,
+    extractor: PdfExtractor,
+    batch_id: str,
+    group: list[tuple[str, dict]],
+):
+    for filename, entry in group:
+        for doi in entry["dois"]:
+            await set_batch_item(db, batch_id, doi, "ingesting", filename)
+
+    try:
+        ingested_docs = await llm_client.bulk_ingest(
+            [entry["file_path"] for _, entry in group]
+        )
+    except Exception as e:
+        if len(group) > 1:
+            # One bad PDF fails the whole request; find it by ingesting the
+            # files of the group one at a time
+            logger.warning(
+                "Bulk ingest in batch %s failed, retrying per file: %s", batch_id, e
+            )
+            for item in group:
+                await _ingest_group(
+                    llm_client, db, doc_registry, extractor, batch_id, [item]
+                )
+            return
+        error = str(e.detail) if isinstance(e, HTTPException) else str(e)
+        for filename, entry in group:
+            for doi in entry["dois"]:
+                await set_batch_item(db, batch_id, doi, "failed", filename, error)
+        return
+
+    doc_registry.add(doc.doc_id for doc in ingested_docs)
+    doc_ids: dict[str, list[str]] = {}
+    for doc in ingested_docs:
+        doc_ids.setdefault((doc.doc_metadata or {}).get("file_name"), []).append(
+            doc.doc_id
+        )
+
+    for filename, entry in group:
+        try:
+            status, error = await _map_file(
+                llm_client,
+                db,
+                doc_registry,
+                extractor,
+                filename,
+                entry,
+                doc_ids.get(filename, []),
+            )
+        except Exception as e:
+            logger.exception("Could not map %s of batch %s", filename, batch_id)
+            status, error = "failed", str(e)
+        for doi in entry["dois"]:
+            await set_batch_item(db, batch_id, doi, status, filename, error)
+
+
+async def _map_file(
+    llm_client: LLMClient,
+    db: Database,
+    doc_registry: DocRegistry,
+    extractor: PdfExtractor,
+    filename: str,
+    entry: dict,
+    doc_ids: list[str],
+) -> tuple[str, str | None]:
+    """Map an ingested file to its documents, returning (status, error)."""
+    if not doc_ids:
+        return "failed", "No documents were produced for this file"
+    content_hash = entry["content_hash"] or await run_in_threadpool(
+        file_sha256, Path(entry["file_path"])
+    )
+    try:
+        # Like single-file ingestion, a file maps to its first document
+        await insert_mapping(db, filename, doc_ids[0], content_hash, doc_ids)
+    except HTTPException:
+        # Mapped by another ingest in the meantime: this copy is a duplicate
+        await llm_client.bulk_delete(doc_ids)
+        doc_registry.discard(doc_ids)
+        return "skipped", None
+    await index_pages(extractor, db, Path(entry["file_path"]), content_hash)
+    return "done", None
+
+
+async def run_doi_batch(
+    scihub: SciHubApi,
+    http: HttpSession,
+    llm_client: LLMClient,
+    db: Database,
+    doc_registry: DocRegistry,
+    extractor: PdfExtractor,
+    batch_id: str,
+    dois: list[str],
+    refresh: bool = False,
+):
+    pending = await _resolve_batch(scihub, http, db, batch_id, dois, refresh)
+    entries = list(pending.items())
+    for start in range(0, len(entries), DOI_BULK_INGEST_SIZE):
+        await _ingest_group(
+            llm_client,
+            db,
+            doc_registry,
+            extractor,
+            batch_id,
+            entries[start : start + DOI_BULK_INGEST_SIZE],
+        )
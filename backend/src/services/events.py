@@ -0,0 +1,49 @@
+import asyncio
+import json
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class EventBus:
+    """In-process pub/sub for job progress, consumed by the SSE endpoint.
+
+    Topics are plain strings (a file name, a batch id). Every subscriber
+    gets its own bounded queue; a subscriber that stops reading loses its
+    oldest events rather than holding up the publishers.
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    def publish(self, topic: str, event: dict):
+        for queue in self._subscribers.get(topic, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    @contextmanager
+    def subscribe(self, topic: str) -> Iterator[asyncio.Queue]:
+        """Yield a queue receiving the topic's events; `None` means close."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def close(self):
+        """Tell every open stream to finish, e.g. on shutdown."""
+        for subscribers in self._subscribers.values():
+            for queue in subscribers:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,105 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from fastapi.concurrency import run_in_threadpool
+
+from src.crud.database import Database
+from src.crud.pdf_pages import get_pdf_pages, set_pdf_pages
+from src.services.helper import file_sha256
+
+
+# PyMuPDF is imported inside the workers: the API process never parses a
+# PDF itself, so it does not pay for the import at startup
+
+
+def _page_count(file_path: str) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as pdf:
+        return pdf.page_count
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> list[str]:
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as pdf:
+        return [pdf[number].get_text() for number in range(start, stop)]
+
+
+class PdfExtractor:
+    """Page text extraction in a process pool, cached per content hash.
+
+    PyMuPDF holds the GIL while parsing, so extraction runs in worker
+    processes, and large PDFs are split into page ranges parsed in parallel.
+    The text of every page is stored by the file's content hash; later
+    summaries (and anything else needing the text) read it from there.
+    """
+
+    def __init__(self, max_workers: int, pages_per_task: int):
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self._pool: ProcessPoolExecutor | None = None
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def start(self):
+        if self._pool is None:
+            # Not forked: forking the server, with its threads mid-flight
+            # (threadpool, aiohttp, sqlite), can deadlock the children
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def close(self):
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            raise RuntimeError("PDF extractor is not started")
+        return self._pool
+
+    async def _extract(self, db: Database, file_path: Path, content_hash: str):
+        loop = asyncio.get_running_loop()
+        path = str(file_path)
+        page_count = await loop.run_in_executor(self.pool, _page_count, path)
+        ranges = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    self.pool,
+                    _extract_page_range,
+                    path,
+                    start,
+                    min(start + self.pages_per_task, page_count),
+                )
+                for start in range(0, page_count, self.pages_per_task)
+            )
+        )
+        pages = [text for page_range in ranges for text in page_range]
+        await set_pdf_pages(db, content_hash, pages)
+        return pages
+
+    async def extract_pages(
+        self, db: Database, file_path: Path, content_hash: str | None = None
+    ) -> list[str]:
+        """Return the text of every page, parsing the PDF only on a cache miss."""
+        if content_hash is None:
+            content_hash = await run_in_threadpool(file_sha256, file_path)
+        pages = await get_pdf_pages(db, content_hash)
+        if pages is not None:
+            return pages
+        # Concurrent callers for the same file share one extraction
+        if content_hash not in self._inflight:
+            task = asyncio.create_task(self._extract(db, file_path, content_hash))
+            self._inflight[content_hash] = task
+            task.add_done_callback(lambda _: self._inflight.pop(content_hash, None))
+        return await asyncio.shield(self._inflight[content_hash])
+
+    async def extract_text(
+        self, db: Database, file_path: Path, content_hash: str | None = None
+    ) -> str:
+        return "".join(await self.extract_pages(db, file_path, content_hash))
@@ -1,29 +1,27 @@
+import hashlib
+import uuid
 from pathlib import Path
-import aiohttp
-from fastapi import HTTPException
-import fitz  # PyMuPDF
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 
-DOWNLOAD_FOLDER = Path("../Media")
-DOWNLOAD_FOLDER.mkdir(exist_ok=True)
 
-async def download_pdf(pdf_url: str, filename: str) -> Path:
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(pdf_url) as response:
-                if response.status == 200:
-                    file_path = DOWNLOAD_FOLDER / filename
-                    with open(file_path, 'wb') as f:
-                        f.write(await response.read())
-                    return file_path
-                else:
-                    raise HTTPException(status_code=404, detail="Failed to download PDF")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error occurred: {str(e)}")
+async def save_upload(
+    upload: UploadFile, folder: Path, chunk_size: int = 1 << 20
+) -> tuple[Path, str]:
+    """Stream an upload into a temporary file in `folder`, hashing on the way.
 
-def extract_text_from_pdf(file_path: Path) -> str:
-    text = ""
-    with fitz.open(file_path) as pdf:
-        for page in pdf:
-            page_text = page.get_text()
-            text += page_text
-    return text
+    Returns the temporary path and the SHA-256 of the content. The caller
+    moves the file into place (or deletes it); keeping the temp file in the
+    target folder makes that move an atomic rename.
+    """
+    tmp_path = folder / f".upload-{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, "wb") as f:
+            while chunk := await upload.read(chunk_size):
+                digest.update(chunk)
+                await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path, digest.hexdigest()
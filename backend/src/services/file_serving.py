@@ -0,0 +1,101 @@
+import os
+import re
+from pathlib import Path
+from typing import Iterator
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+
+from src.services.helper import file_sha256
+
+# Files can be replaced under the same name, so clients may keep a copy but
+# must revalidate it; with the ETag below that costs a 304 round trip
+CACHE_CONTROL = "private, no-cache"
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Parse a single `bytes=` range into an inclusive (start, end).
+
+    Raises ValueError when it cannot be satisfied; returns None for forms
+    that are not supported (multiple ranges), which are served in full.
+    """
+    match = _RANGE.match(header.replace(" ", ""))
+    if match is None:
+        if "," in header:
+            return None
+        raise ValueError(header)
+    first, last = match.groups()
+    if not first and not last:
+        raise ValueError(header)
+    if not first:
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _read_range(
+    file_path: Path, start: int, end: int, chunk_size: int = 1 << 16
+) -> Iterator[bytes]:
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+async def file_response(request: Request, file_path: Path) -> Response:
+    """Serve a file with a content-hash ETag, 304s and single byte ranges."""
+    etag = f'"{await run_in_threadpool(file_sha256, file_path)}"'
+    size = os.stat(file_path).st_size
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A range is only honoured against the representation the client has
+    if range_header is not None and (if_range is None or if_range == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(
+                status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"}
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            return StreamingResponse(
+                _read_range(file_path, start, end),
+                status_code=206,
+                media_type="application/pdf",
+                headers={
+                    **headers,
+                    "Content-Range": f"bytes {start}-{end}/{size}",
+                    "Content-Length": str(end - start + 1),
+                },
+            )
+
+    return FileResponse(file_path, headers=headers)
@@ -1,3 +1,74 @@
-def split_text_into_chunks(text: str, chunk_size: int = 2048) -> list:
-    """Split text into manageable chunks."""
-    return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+import hashlib
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from src.consts import FILE_HASH_CACHE_SIZE
+
+# Words and punctuation marks; close enough to a BPE token count for
+# sizing prompts without pulling in a tokenizer
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(_TOKEN_RE.findall(text))
+
+
+def _split_oversized(text: str, max_tokens: int) -> list[str]:
+    """Break a paragraph that is too long into sentences, then into words."""
+    pieces = []
+    for sentence in _SENTENCE_END_RE.split(text):
+        if estimate_tokens(sentence) <= max_tokens:
+            pieces.append(sentence)
+            continue
+        words = sentence.split()
+        # Words can carry punctuation, so leave headroom below max_tokens
+        step = max(1, max_tokens // 2)
+        pieces.extend(" ".join(words[i : i + step]) for i in range(0, len(words), step))
+    return pieces
+
+
+def split_text_into_chunks(text: str, max_tokens: int = 1500) -> list:
+    """Split text into chunks of at most ~max_tokens, on paragraph and
+    sentence boundaries where possible."""
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(_split_oversized(paragraph, max_tokens))
+
+    chunks = []
+    current: list[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+@lru_cache(maxsize=FILE_HASH_CACHE_SIZE)
+def _sha256(path: str, size: int, mtime_ns: int, block_size: int) -> str:
+    # size and mtime are only part of the key: a new version is a new entry,
+    # and the old one ages out
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_sha256(file_path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, memoized on (path, size, mtime)."""
+    stat = file_path.stat()
+    return _sha256(str(file_path.resolve()), stat.st_size, stat.st_mtime_ns, block_size)
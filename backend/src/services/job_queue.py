@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+
+from src.crud.database import Database
+from src.metrics import JOB_DURATION
+from src.services.events import EventBus
+from src.crud.jobs import (
+    claim_job,
+    enqueue_job,
+    fail_job,
+    finish_job,
+    requeue_running_jobs,
+    retry_job,
+)
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[..., Awaitable[Any]]
+JobTopic = Callable[[dict], str]
+
+
+class JobQueue:
+    """Durable background job queue backed by the `jobs` table.
+
+    A fixed pool of worker tasks claims due jobs one at a time, so a burst
+    of uploads is worked through at a steady rate instead of all at once.
+    Failed jobs are retried with exponential backoff. Jobs that were running
+    when the process stopped are put back in the queue on the next start.
+
+    Every state change is published as a "job" event on the topic the job's
+    kind derives from its payload (e.g. the file name being ingested).
+    """
+
+    def __init__(
+        self,
+        events: EventBus,
+        workers: int,
+        max_attempts: int,
+        backoff: float,
+        backoff_max: float,
+        poll_interval: float = 1.0,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.events = events
+        self._handlers: dict[str, JobHandler] = {}
+        self._topics: dict[str, JobTopic] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    def register(self, kind: str, handler: JobHandler, topic: JobTopic | None = None):
+        """Run `handler(**payload)` for jobs of this kind.
+
+        `topic(payload)` names the event topic the job's progress goes to.
+        """
+        self._handlers[kind] = handler
+        if topic is not None:
+            self._topics[kind] = topic
+
+    def _publish(self, job_id: int, kind: str, payload: dict, status: str, **fields):
+        topic = self._topics.get(kind)
+        if topic is not None:
+            self.events.publish(
+                topic(payload),
+                {
+                    "type": "job",
+                    "job_id": job_id,
+                    "kind": kind,
+                    "status": status,
+                    **fields,
+                },
+            )
+
+    async def enqueue(
+        self,
+        db: Database,
+        kind: str,
+        payload: dict,
+        idempotency_key: str | None = None,
+        rerun_done: bool = False,
+    ) -> int:
+        """Queue a job, or return the id of the job with the same key.
+
+        A job with the same key is reused unless it failed. Pass
+        `rerun_done` to also run it again when it is done, for a job whose
+        result has since been deleted.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        job_id = await enqueue_job(
+            db, kind, payload, idempotency_key, self.max_attempts, rerun_done
+        )
+        self._publish(job_id, kind, payload, "queued")
+        self._wakeup.set()
+        return job_id
+
+    async def start(self, db: Database):
+        if self._tasks:
+            return
+        await requeue_running_jobs(db)
+        self._tasks = [asyncio.create_task(self._work(db)) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _retry_delay(self, attempts: int) -> float:
+        return min(self.backoff * 2 ** (attempts - 1), self.backoff_max)
+
+    async def _run(self, db: Database, job: dict):
+        publish = partial(self._publish, job["id"], job["kind"], job["payload"])
+        publish("running", attempts=job["attempts"])
+        started = time.perf_counter()
+        try:
+            await self._handlers[job["kind"]](**job["payload"])
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            error = str(e.detail) if isinstance(e, HTTPException) else str(e)
+            if job["attempts"] < job["max_attempts"]:
+                delay = self._retry_delay(job["attempts"])
+                logger.warning(
+                    "Job %s (%s) failed, retrying in %.0fs: %s",
+                    job["id"],
+                    job["kind"],
+                    delay,
+                    error,
+                )
+                JOB_DURATION.labels(kind=job["kind"], outcome="retried").observe(
+                    elapsed
+                )
+                await retry_job(db, job["id"], delay, error)
+                publish("queued", attempts=job["attempts"], error=error)
+            else:
+                logger.error("Job %s (%s) failed: %s", job["id"], job["kind"], error)
+                JOB_DURATION.labels(kind=job["kind"], outcome="failed").observe(elapsed)
+                await fail_job(db, job["id"], error)
+                publish("failed", attempts=job["attempts"], error=error)
+        else:
+            JOB_DURATION.labels(kind=job["kind"], outcome="done").observe(
+                time.perf_counter() - started
+            )
+            await finish_job(db, job["id"])
+            publish("done", attempts=job["attempts"])
+
+    async def _work(self, db: Database):
+        while True:
+            # Cleared before claiming, so an enqueue that lands after an
+            # empty claim still wakes this worker up
+            self._wakeup.clear()
+            try:
+                job = await claim_job(db)
+            except Exception:
+                logger.exception("Could not claim a job")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(db, job)
+            except Exception:
+                # e.g. the database being locked while recording the outcome.
+                # The job is left running, and requeued on the next start
+                logger.exception("Job %s (%s) could not be run", job["id"], job["kind"])
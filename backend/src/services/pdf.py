@@ -1,37 +1,51 @@
-from pathlib import Path
+import hashlib
+import os
+import uuid
 
 from fastapi import HTTPException
-import aiohttp
-import fitz
-import test
+from fastapi.concurrency import run_in_threadpool
 
+from src.api_.clients.http import HttpSession
 from src.consts import DOWNLOAD_FOLDER
+from src.metrics import time_outbound
 
 
-def extract_text_from_pdf(file_path: Path) -> str:
-    text = ""
-    with fitz.open(file_path) as pdf:
-        for page in pdf:
-            page_text = page.get_text()
-            text += page_text
-    return text
+async def download_pdf(
+    http: HttpSession,
+    pdf_url: str,
+    filename: str,
+    etag: str | None = None,
+    chunk_size: int = 1 << 16,
+):
+    """Stream a PDF into DOWNLOAD_FOLDER.
 
-
-async def download_pdf(pdf_url: str, filename: str):
+    Returns (file_path, content_hash, etag). If `etag` is given and the
+    server answers 304 Not Modified, nothing is written and file_path is None.
+    """
+    headers = {"If-None-Match": etag} if etag else {}
+    file_path = DOWNLOAD_FOLDER / filename
+    tmp_path = DOWNLOAD_FOLDER / f".download-{uuid.uuid4().hex}.part"
+    await http.throttle(pdf_url)
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(pdf_url) as response:
-                print(pdf_url)
-                if response.status == 200:
-                    file_path = DOWNLOAD_FOLDER / filename
-                    with open(file_path, "wb") as f:
-                        text = await response.read()
-                        print(str(text))
-                        f.write(text)
-                    return file_path
-                else:
+        with time_outbound("pdf_mirror", "download"):
+            async with http.session.get(pdf_url, headers=headers) as response:
+                if response.status == 304:
+                    return None, None, etag
+                if response.status != 200:
                     raise HTTPException(
                         status_code=404, detail="Failed to download PDF"
                     )
+
+                digest = hashlib.sha256()
+                with open(tmp_path, "wb") as f:
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        digest.update(chunk)
+                        await run_in_threadpool(f.write, chunk)
+                os.replace(tmp_path, file_path)
+                return file_path, digest.hexdigest(), response.headers.get("ETag")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error occurred: {str(e)}")
+    finally:
+        tmp_path.unlink(missing_ok=True)
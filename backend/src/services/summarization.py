@@ -1,52 +1,213 @@
+import asyncio
+import hashlib
+import logging
 from pathlib import Path
-from pgpt_python.client import PrivateGPTApi
+from typing import Awaitable, Callable
+from fastapi.concurrency import run_in_threadpool
 
-from src.services.pdf import extract_text_from_pdf
-from src.crud.temp_cruds import insert_mapping
-from src.services.helper import split_text_into_chunks
+from src.api_.clients.llm_client import LLMClient
 
+from src.crud.database import Database
+from src.services.doc_registry import DocRegistry
+from src.consts import SUMMARY_CHUNK_TOKENS, SUMMARY_MAP_CONCURRENCY
+from src.crud.summaries import (
+    get_chunk_summary,
+    set_chunk_summary,
+    set_summary_status,
+)
+from src.services.extraction import PdfExtractor
+from src.crud.temp_cruds import get_file_id, insert_mapping
+from src.services.helper import (
+    estimate_tokens,
+    file_sha256,
+    split_text_into_chunks,
+)
 
-async def summarize_text(pgpt_client: PrivateGPTApi, text: str) -> str:
-    chunks = split_text_into_chunks(text)
-    summaries = []
-    try:
+logger = logging.getLogger(__name__)
 
-        for chunk in chunks:
-            response = pgpt_client.contextual_completions.prompt_completion(
-                prompt=f"Summarize this document:\n{chunk}"
-            )
-            if response.choices[0].message is not None:
-                print(response.choices[0].message.content)
+# Bump whenever the summarization prompt or strategy changes, so cached
+# summaries produced by the old one are not served anymore.
+SUMMARY_PROMPT_VERSION = "v2"
 
-            if response.choices[0].message is not None:
-                summaries.append(response.choices[0].message.content)
-            return " ".join(summaries)
 
-    except Exception as e:
-        print(f"An error occurred during summarization: {str(e)}")
-        summaries.append(f"An error occurred during summarization. {str(e)}")
-    return " ".join(summaries)
+MAP_PROMPT = "Summarize this part of a research paper:\n{text}"
+REDUCE_PROMPT = (
+    "Combine these partial summaries of a research paper into one "
+    "coherent summary:\n{text}"
+)
+
+
+async def _complete(llm_client: LLMClient, prompt: str) -> str:
+    response = await llm_client.prompt_completion(prompt)
+    message = response.choices[0].message
+    if message is None or message.content is None:
+        raise ValueError("The LLM returned an empty completion.")
+    return message.content
+
+
+async def _summarize_chunk(
+    llm_client: LLMClient,
+    db: Database,
+    semaphore: asyncio.Semaphore,
+    template: str,
+    text: str,
+) -> str:
+    prompt = template.format(text=text)
+    chunk_hash = hashlib.sha256(
+        f"{SUMMARY_PROMPT_VERSION}\0{prompt}".encode()
+    ).hexdigest()
+    cached = await get_chunk_summary(db, chunk_hash)
+    if cached is not None:
+        return cached
+
+    async with semaphore:
+        summary = await _complete(llm_client, prompt)
+    await set_chunk_summary(db, chunk_hash, summary)
+    return summary
+
+
+def _group_for_reduce(summaries: list[str], max_tokens: int) -> list[list[str]]:
+    """Pack summaries into groups that fit one reduce prompt.
+
+    Every group takes at least two summaries, so each reduce round at least
+    halves the number of summaries even if some of them are very long.
+    """
+    groups: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+    for summary in summaries:
+        tokens = estimate_tokens(summary)
+        if len(current) >= 2 and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+ProgressCallback = Callable[[int, int], None]
+
+
+async def summarize_text(
+    llm_client: LLMClient,
+    db: Database,
+    text: str,
+    on_progress: ProgressCallback | None = None,
+) -> str:
+    """Map-reduce summarization.
+
+    Chunks are summarized concurrently (bounded by SUMMARY_MAP_CONCURRENCY),
+    then the partial summaries are reduced in rounds until one is left.
+    Every prompt's result is cached by its hash, so a retried or re-versioned
+    job only pays for the chunks that actually changed.
+
+    `on_progress(done, total)` is called after every finished prompt; the
+    total grows as reduce rounds are scheduled.
+    """
+    semaphore = asyncio.Semaphore(SUMMARY_MAP_CONCURRENCY)
+    chunks = split_text_into_chunks(text, SUMMARY_CHUNK_TOKENS)
+    if not chunks:
+        raise ValueError("Nothing to summarize.")
+    done, total = 0, len(chunks)
+
+    async def tracked(call: Awaitable[str]) -> str:
+        nonlocal done
+        result = await call
+        done += 1
+        if on_progress is not None:
+            on_progress(done, total)
+        return result
+
+    summaries = await asyncio.gather(
+        *(
+            tracked(_summarize_chunk(llm_client, db, semaphore, MAP_PROMPT, chunk))
+            for chunk in chunks
+        )
+    )
+
+    while len(summaries) > 1:
+        groups = _group_for_reduce(summaries, SUMMARY_CHUNK_TOKENS)
+        total += sum(1 for group in groups if len(group) > 1)
+        summaries = await asyncio.gather(
+            *(
+                tracked(
+                    _summarize_chunk(
+                        llm_client, db, semaphore, REDUCE_PROMPT, "\n\n".join(group)
+                    )
+                )
+                if len(group) > 1
+                else asyncio.sleep(0, group[0])
+                for group in groups
+            )
+        )
+    return summaries[0]
 
 
 async def background_summarize(
-    pgpt_client: PrivateGPTApi,
-    summary_store: dict,
+    llm_client: LLMClient,
+    db: Database,
+    extractor: PdfExtractor,
     file_path: Path,
-    file_name: str,
+    content_hash: str,
+    on_progress: ProgressCallback | None = None,
 ):
-    text = extract_text_from_pdf(file_path)
-    if not text.strip():
-        raise ValueError("No text extracted from PDF.")
-    summary = await summarize_text(pgpt_client, text)
-    summary_store[file_name] = {"summary": summary, "status": "completed"}
+    await set_summary_status(db, content_hash, SUMMARY_PROMPT_VERSION, "running")
+    try:
+        text = await extractor.extract_text(db, file_path, content_hash)
+        if not text.strip():
+            raise ValueError("No text extracted from PDF.")
+        summary = await summarize_text(llm_client, db, text, on_progress)
+    except Exception as e:
+        await set_summary_status(
+            db, content_hash, SUMMARY_PROMPT_VERSION, "failed", error=str(e)
+        )
+        logger.warning("Summarization of %s failed: %s", file_path.name, e)
+        return
+    await set_summary_status(
+        db, content_hash, SUMMARY_PROMPT_VERSION, "done", summary=summary
+    )
 
-    print(f"Summary for {file_path.name}: {summary}")
+    logger.debug("Summary for %s: %s", file_path.name, summary)
 
 
-def ingest_file_and_store(pgpt_client: PrivateGPTApi, file_path: str, filename: str):
-    with open(file_path, "rb") as f:
-        ingested_file_doc_id = (
-            pgpt_client.ingestion.ingest_file(file=f, timeout=500).data[0].doc_id
-        )
-    print(f"Ingested file doc_id: {ingested_file_doc_id}")
-    insert_mapping(filename, ingested_file_doc_id)
+async def index_pages(
+    extractor: PdfExtractor, db: Database, file_path: Path, content_hash: str
+):
+    """Extract and cache the page text, which makes the file searchable.
+
+    Best effort: a PDF that cannot be parsed here is still ingested.
+    """
+    try:
+        await extractor.extract_pages(db, file_path, content_hash)
+    except Exception as e:
+        logger.warning("Could not extract the pages of %s: %s", file_path.name, e)
+
+
+async def ingest_file_and_store(
+    llm_client: LLMClient,
+    db: Database,
+    doc_registry: DocRegistry,
+    extractor: PdfExtractor,
+    file_path: str,
+    filename: str,
+    content_hash: str | None = None,
+):
+    # Jobs can be retried after a partial run; never ingest a mapped file twice
+    if await get_file_id(db, filename) is not None:
+        return
+    if content_hash is None:
+        content_hash = await run_in_threadpool(file_sha256, Path(file_path))
+    ingested_docs = await llm_client.ingest_file(file_path)
+    doc_registry.add(doc.doc_id for doc in ingested_docs)
+    ingested_file_doc_id = ingested_docs[0].doc_id
+    logger.info("Ingested %s as %s", filename, ingested_file_doc_id)
+    await insert_mapping(
+        db,
+        filename,
+        ingested_file_doc_id,
+        content_hash,
+        [doc.doc_id for doc in ingested_docs],
+    )
+    await index_pages(extractor, db, Path(file_path), content_hash)
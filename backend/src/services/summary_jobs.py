@@ -0,0 +1,106 @@
+import asyncio
+from pathlib import Path
+
+from fastapi.concurrency import run_in_threadpool
+
+from src.api_.clients.llm_client import LLMClient
+from src.crud.database import Database
+from src.crud.summaries import (
+    fail_unfinished_summaries,
+    get_summary,
+    set_summary_status,
+)
+from src.services.events import EventBus
+from src.services.extraction import PdfExtractor
+from src.services.helper import file_sha256
+from src.services.summarization import SUMMARY_PROMPT_VERSION, background_summarize
+
+
+class SummaryJobs:
+    """Single-flight front end for the persistent summary store.
+
+    Summaries are keyed by the file's content hash and the prompt version,
+    so a renamed or re-uploaded paper reuses its summary. At most one task
+    runs per key in this process; concurrent requests for the same paper
+    attach to the running job instead of starting a new LLM summarization.
+    State changes and progress are published as "summary" events on the
+    topic of every file name that asked for the running job.
+    """
+
+    def __init__(self, max_concurrency: int, events: EventBus, extractor: PdfExtractor):
+        self.events = events
+        self.extractor = extractor
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._topics: dict[str, set[str]] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def recover(self, db: Database):
+        await fail_unfinished_summaries(db, "Interrupted by a server restart.")
+
+    def _publish(self, content_hash: str, status: str, **fields):
+        event = {"type": "summary", "status": status, **fields}
+        for topic in self._topics.get(content_hash, ()):
+            self.events.publish(topic, event)
+
+    async def _run(
+        self, llm_client: LLMClient, db: Database, file_path: Path, content_hash: str
+    ):
+        cached = await get_summary(db, content_hash, SUMMARY_PROMPT_VERSION)
+        if cached and cached["status"] == "done":
+            self._publish(content_hash, "done", summary=cached["summary"])
+            return
+        await set_summary_status(db, content_hash, SUMMARY_PROMPT_VERSION, "queued")
+        self._publish(content_hash, "queued")
+        async with self._semaphore:
+            self._publish(content_hash, "running")
+            await background_summarize(
+                llm_client,
+                db,
+                self.extractor,
+                file_path,
+                content_hash,
+                on_progress=lambda done, total: self._publish(
+                    content_hash, "running", done=done, total=total
+                ),
+            )
+        job = await get_summary(db, content_hash, SUMMARY_PROMPT_VERSION)
+        if job is not None:
+            self._publish(
+                content_hash, job["status"], summary=job["summary"], error=job["error"]
+            )
+
+    def _finished(self, content_hash: str):
+        self._inflight.pop(content_hash, None)
+        self._topics.pop(content_hash, None)
+
+    async def submit(self, llm_client: LLMClient, db: Database, file_path: Path):
+        content_hash = await run_in_threadpool(file_sha256, file_path)
+        # No await between the membership test and the insert, so two
+        # concurrent submits cannot both start a task for the same key
+        self._topics.setdefault(content_hash, set()).add(file_path.name)
+        if content_hash not in self._inflight:
+            task = asyncio.create_task(
+                self._run(llm_client, db, file_path, content_hash)
+            )
+            self._inflight[content_hash] = task
+            task.add_done_callback(lambda _: self._finished(content_hash))
+        job = await get_summary(db, content_hash, SUMMARY_PROMPT_VERSION)
+        if job is None or (
+            job["status"] == "failed" and content_hash in self._inflight
+        ):
+            return {
+                "status": "queued",
+                "summary": None,
+                "error": None,
+                "updated_at": None,
+            }
+        return job
+
+    async def get(self, db: Database, file_path: Path):
+        content_hash = await run_in_threadpool(file_sha256, file_path)
+        return await get_summary(db, content_hash, SUMMARY_PROMPT_VERSION)
+
+    async def shutdown(self):
+        for task in list(self._inflight.values()):
+            task.cancel()
+        await asyncio.gather(*self._inflight.values(), return_exceptions=True)
@@ -0,0 +1,17 @@
+import os
+
+from src.services.helper import _sha256, file_sha256
+
+
+def test_file_hash_is_cached_per_version_in_a_bounded_cache(tmp_path):
+    path = tmp_path / "paper.pdf"
+    _sha256.cache_clear()
+    for version in range(3):
+        path.write_bytes(f"version {version}".encode())
+        os.utime(path, ns=(version, version))
+        file_sha256(path)
+        file_sha256(path)
+
+    info = _sha256.cache_info()
+    assert (info.hits, info.misses) == (3, 3)
+    assert info.maxsize is not None
@@ -0,0 +1,67 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from src.services import job_queue
+from src.services.events import EventBus
+from src.services.job_queue import JobQueue
+
+
+def _job(job_id: int) -> dict:
+    return {
+        "id": job_id,
+        "kind": "test",
+        "payload": {"number": job_id},
+        "attempts": 1,
+        "max_attempts": 3,
+    }
+
+
+def test_worker_survives_a_bookkeeping_error(monkeypatch: pytest.MonkeyPatch):
+    due = [_job(1), _job(2)]
+    finished = []
+
+    async def claim_job(db):
+        return due.pop(0) if due else None
+
+    async def finish_job(db, job_id):
+        if job_id == 1:
+            raise sqlite3.OperationalError("database is locked")
+        finished.append(job_id)
+
+    async def requeue_running_jobs(db):
+        pass
+
+    monkeypatch.setattr(job_queue, "claim_job", claim_job)
+    monkeypatch.setattr(job_queue, "finish_job", finish_job)
+    monkeypatch.setattr(job_queue, "requeue_running_jobs", requeue_running_jobs)
+
+    queue = JobQueue(
+        EventBus(),
+        workers=1,
+        max_attempts=3,
+        backoff=1,
+        backoff_max=1,
+        poll_interval=0.01,
+    )
+    ran = []
+
+    async def handler(number):
+        ran.append(number)
+
+    queue.register("test", handler)
+
+    async def run():
+        await queue.start(None)
+        for _ in range(100):
+            if finished:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(run())
+
+    # The first job's outcome could not be recorded, the worker moved on
+    assert ran == [1, 2]
+    assert finished == [2]
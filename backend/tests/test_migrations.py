@@ -0,0 +1,42 @@
+import sqlite3
+
+import pytest
+
+from src.crud import temp_cruds
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_a_failed_migration_leaves_the_previous_version(
+    monkeypatch: pytest.MonkeyPatch, tmp_path
+):
+    conn = sqlite3.connect(tmp_path / "app.db")
+    temp_cruds._migrate(conn)
+    version = len(temp_cruds.MIGRATIONS)
+
+    def add_column_then_crash(conn: sqlite3.Connection):
+        conn.execute("ALTER TABLE file_gpt_map ADD COLUMN added TEXT")
+        raise RuntimeError("Killed halfway")
+
+    monkeypatch.setattr(
+        temp_cruds, "MIGRATIONS", [*temp_cruds.MIGRATIONS, add_column_then_crash]
+    )
+    with pytest.raises(RuntimeError):
+        temp_cruds._migrate(conn)
+
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == version
+    assert "added" not in _columns(conn, "file_gpt_map")
+
+    # The next start applies it from scratch
+    def add_column(conn: sqlite3.Connection):
+        conn.execute("ALTER TABLE file_gpt_map ADD COLUMN added TEXT")
+
+    monkeypatch.setattr(
+        temp_cruds, "MIGRATIONS", [*temp_cruds.MIGRATIONS[:-1], add_column]
+    )
+    temp_cruds._migrate(conn)
+
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == version + 1
+    assert "added" in _columns(conn, "file_gpt_map")
@@ -4,9 +4,13 @@ import logging
 import multiprocessing
 import multiprocessing.pool
 import os
+import sys
 import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
 from pathlib import Path
-from queue import Queue
+from queue import Empty, Queue
 from typing import Any
 
 from llama_index.core.data_structs import IndexDict
@@ -25,6 +29,24 @@ from private_gpt.utils.eta import eta
 logger = logging.getLogger(__name__)
 
 
+def _transform_file_or_none(file_name: str, file_data: Path) -> list[Document] | None:
+    # Module level so that it can be sent to a process pool
+    try:
+        return IngestionHelper.transform_file_into_documents(file_name, file_data)
+    except Exception:
+        logger.exception(f"Skipping {file_data.name}")
+        return None
+
+
+def _stored_documents(ref_docs: dict[str, Any]) -> list[Document]:
+    # Stand-ins for documents already in the docstore, which only keeps
+    # their id and metadata
+    return [
+        Document(id_=doc_id, metadata=dict(ref_doc_info.metadata or {}))
+        for doc_id, ref_doc_info in ref_docs.items()
+    ]
+
+
 class BaseIngestComponent(abc.ABC):
     def __init__(
         self,
@@ -51,6 +73,20 @@ class BaseIngestComponent(abc.ABC):
     def delete(self, doc_id: str) -> None:
         pass
 
+    def bulk_delete(self, doc_ids: list[str]) -> None:
+        for doc_id in doc_ids:
+            self.delete(doc_id)
+
+    @abc.abstractmethod
+    def incremental_ingest(
+        self, files: list[tuple[str, Path]], remove_missing: bool = False
+    ) -> list[Document]:
+        pass
+
+    @abc.abstractmethod
+    def remove_missing_files(self, file_names: Iterable[str]) -> int:
+        pass
+
 
 class BaseIngestComponentWithIndex(BaseIngestComponent, abc.ABC):
     def __init__(
@@ -105,6 +141,195 @@ class BaseIngestComponentWithIndex(BaseIngestComponent, abc.ABC):
             # Save the index
             self._save_index()
 
+    def bulk_delete(self, doc_ids: list[str]) -> None:
+        with self._index_thread_lock:
+            for doc_id in doc_ids:
+                self._index.delete_ref_doc(doc_id, delete_from_docstore=True)
+
+            # Persisting rewrites the whole index, so do it once for all docs
+            self._save_index()
+
+    @staticmethod
+    def _file_hash_key(file_name: str) -> str:
+        # File hashes share the docstore's hash collection with the documents
+        return f"file_hash::{file_name}"
+
+    def _set_document_hashes(self, documents: list[Document]) -> None:
+        for document in documents:
+            self._index.docstore.set_document_hash(
+                document.get_doc_id(), IngestionHelper.document_hash(document)
+            )
+
+    def _documents_by_file(self) -> dict[str, dict[str, Any]]:
+        """Map each ingested file name to {doc_id: RefDocInfo} of its documents."""
+        by_file: dict[str, dict[str, Any]] = defaultdict(dict)
+        ref_docs = self._index.docstore.get_all_ref_doc_info() or {}
+        for doc_id, ref_doc_info in ref_docs.items():
+            file_name = (ref_doc_info.metadata or {}).get("file_name")
+            if file_name is not None:
+                by_file[file_name][doc_id] = ref_doc_info
+        return by_file
+
+    def _parse_files(
+        self, files: list[tuple[str, Path]]
+    ) -> list[list[Document] | None]:
+        """Parse files into documents, None for the ones that failed."""
+        return [_transform_file_or_none(*file) for file in files]
+
+    def _forget_missing_files(
+        self, known: dict[str, dict[str, Any]], file_names: set[str]
+    ) -> list[str]:
+        """Forget the synced files not in `file_names`, returning their doc ids.
+
+        Must be called with the index lock held.
+        """
+        docstore = self._index.docstore
+        doc_ids: list[str] = []
+        for file_name, previous in known.items():
+            key = self._file_hash_key(file_name)
+            if file_name not in file_names and docstore.get_document_hash(key):
+                doc_ids.extend(previous)
+                docstore.delete_document(key, raise_error=False)
+        return doc_ids
+
+    def remove_missing_files(self, file_names: Iterable[str]) -> int:
+        """Delete the files synced by `incremental_ingest` that are not listed.
+
+        This is `remove_missing` on its own, for callers that sync a large
+        folder over several `incremental_ingest` calls. Returns the number
+        of documents deleted.
+        """
+        with self._index_thread_lock:
+            doc_ids = self._forget_missing_files(
+                self._documents_by_file(), set(file_names)
+            )
+            for doc_id in doc_ids:
+                self._index.delete_ref_doc(doc_id, delete_from_docstore=True)
+            if doc_ids:
+                self._save_index()
+        return len(doc_ids)
+
+    def _insert_documents(self, documents: list[Document]) -> set[str]:
+        """Embed and save documents, as `bulk_ingest` does after parsing.
+
+        Returns the names of the files whose documents could not be saved.
+        """
+        self._save_docs(documents)  # type: ignore[attr-defined]
+        return set()
+
+    def incremental_ingest(
+        self, files: list[tuple[str, Path]], remove_missing: bool = False
+    ) -> list[Document]:
+        """Bring the index up to date with files that may have been ingested before.
+
+        Files are identified by name. A file whose bytes hash to the same
+        value as the last time it went through here is skipped without
+        being parsed. A changed file is parsed, and only those of its
+        documents whose text or metadata changed are embedded; the
+        documents it no longer produces are deleted. With `remove_missing`,
+        files that went through here before but are not in `files` anymore
+        are deleted too.
+
+        A file that fails to parse or to save keeps its previous version,
+        and its hash is not recorded so that the next run tries it again.
+
+        Returns the documents of all `files`, whether new or unchanged.
+        """
+        docstore = self._index.docstore
+        with self._index_thread_lock:
+            known = self._documents_by_file()
+
+        documents: list[Document] = []
+        changed: list[tuple[str, Path, str]] = []
+        for file_name, file_data in files:
+            file_hash = IngestionHelper.file_hash(file_data)
+            previous = known.get(file_name)
+            if (
+                previous
+                and docstore.get_document_hash(self._file_hash_key(file_name))
+                == file_hash
+            ):
+                documents.extend(_stored_documents(previous))
+            else:
+                changed.append((file_name, file_data, file_hash))
+        logger.info(
+            "Incremental ingestion: count=%s unchanged files, count=%s to ingest",
+            len(files) - len(changed),
+            len(changed),
+        )
+
+        parsed = self._parse_files([(name, data) for name, data, _ in changed])
+        to_insert: list[Document] = []
+        stale_by_file: dict[str, list[str]] = {}
+        file_hashes: dict[str, str] = {}
+        for (file_name, _, file_hash), new_documents in zip(
+            changed, parsed, strict=True
+        ):
+            previous = known.get(file_name, {})
+            if new_documents is None:
+                # Keep serving the last good version of the file
+                documents.extend(_stored_documents(previous))
+                continue
+            reusable: dict[str | None, list[str]] = defaultdict(list)
+            for doc_id in previous:
+                reusable[docstore.get_document_hash(doc_id)].append(doc_id)
+            for document in new_documents:
+                same = reusable.get(IngestionHelper.document_hash(document))
+                if same:
+                    doc_id = same.pop()
+                    documents.extend(_stored_documents({doc_id: previous[doc_id]}))
+                else:
+                    to_insert.append(document)
+            stale_by_file[file_name] = list(
+                itertools.chain.from_iterable(reusable.values())
+            )
+            file_hashes[file_name] = file_hash
+
+        if to_insert:
+            # New versions go in before the old ones are deleted, so a file
+            # never disappears from the index in between
+            failed = self._insert_documents(to_insert)
+            documents.extend(
+                document
+                for document in to_insert
+                if document.metadata["file_name"] not in failed
+            )
+            for file_name in failed:
+                # Keep serving the last good version of the file
+                previous = known.get(file_name, {})
+                stale = stale_by_file.pop(file_name, [])
+                documents.extend(
+                    _stored_documents({doc_id: previous[doc_id] for doc_id in stale})
+                )
+                file_hashes.pop(file_name, None)
+            if failed:
+                logger.warning(
+                    "Incremental ingestion: files=%s could not be saved, "
+                    "keeping their previous version",
+                    sorted(failed),
+                )
+
+        stale_doc_ids = list(itertools.chain.from_iterable(stale_by_file.values()))
+        with self._index_thread_lock:
+            if remove_missing:
+                stale_doc_ids.extend(
+                    self._forget_missing_files(
+                        known, {file_name for file_name, _ in files}
+                    )
+                )
+            for doc_id in stale_doc_ids:
+                self._index.delete_ref_doc(doc_id, delete_from_docstore=True)
+            for file_name, file_hash in file_hashes.items():
+                docstore.set_document_hash(self._file_hash_key(file_name), file_hash)
+            if stale_doc_ids or file_hashes:
+                self._save_index()
+        logger.info(
+            "Incremental ingestion: count=%s documents embedded, count=%s deleted",
+            len(to_insert),
+            len(stale_doc_ids),
+        )
+        return documents
+
 
 class SimpleIngestComponent(BaseIngestComponentWithIndex):
     def __init__(
@@ -140,6 +365,7 @@ class SimpleIngestComponent(BaseIngestComponentWithIndex):
         with self._index_thread_lock:
             for document in documents:
                 self._index.insert(document, show_progress=True)
+            self._set_document_hashes(documents)
             logger.debug("Persisting the index and nodes")
             # persist the index and nodes
             self._save_index()
@@ -199,6 +425,11 @@ class BatchIngestComponent(BaseIngestComponentWithIndex):
         )
         return self._save_docs(documents)
 
+    def _parse_files(
+        self, files: list[tuple[str, Path]]
+    ) -> list[list[Document] | None]:
+        return self._file_to_documents_work_pool.starmap(_transform_file_or_none, files)
+
     def _save_docs(self, documents: list[Document]) -> list[Document]:
         logger.debug("Transforming count=%s documents into nodes", len(documents))
         nodes = run_transformations(
@@ -210,10 +441,7 @@ class BatchIngestComponent(BaseIngestComponentWithIndex):
         with self._index_thread_lock:
             logger.info("Inserting count=%s nodes in the index", len(nodes))
             self._index.insert_nodes(nodes, show_progress=True)
-            for document in documents:
-                self._index.docstore.set_document_hash(
-                    document.get_doc_id(), document.hash
-                )
+            self._set_document_hashes(documents)
             logger.debug("Persisting the index and nodes")
             # persist the index and nodes
             self._save_index()
@@ -281,6 +509,11 @@ class ParallelizedIngestComponent(BaseIngestComponentWithIndex):
         )
         return documents
 
+    def _parse_files(
+        self, files: list[tuple[str, Path]]
+    ) -> list[list[Document] | None]:
+        return self._file_to_documents_work_pool.starmap(_transform_file_or_none, files)
+
     def _save_docs(self, documents: list[Document]) -> list[Document]:
         logger.debug("Transforming count=%s documents into nodes", len(documents))
         nodes = run_transformations(
@@ -292,10 +525,7 @@ class ParallelizedIngestComponent(BaseIngestComponentWithIndex):
         with self._index_thread_lock:
             logger.info("Inserting count=%s nodes in the index", len(nodes))
             self._index.insert_nodes(nodes, show_progress=True)
-            for document in documents:
-                self._index.docstore.set_document_hash(
-                    document.get_doc_id(), document.hash
-                )
+            self._set_document_hashes(documents)
             logger.debug("Persisting the index and nodes")
             # persist the index and nodes
             self._save_index()
@@ -316,24 +546,124 @@ class ParallelizedIngestComponent(BaseIngestComponentWithIndex):
         self._file_to_documents_work_pool.terminate()
 
 
+# A float in a Python list: an 8-byte pointer to a 24-byte float object
+_EMBEDDING_BYTES_PER_DIMENSION = 32
+
+
+def _estimate_bytes(nodes: list[Document] | list[BaseNode]) -> int:
+    """Rough in-memory size of documents or nodes: text, metadata, embedding."""
+    size = 0
+    for node in nodes:
+        size += sys.getsizeof(node.get_content())
+        size += sum(sys.getsizeof(value) for value in node.metadata.values())
+        size += _EMBEDDING_BYTES_PER_DIMENSION * len(node.embedding or ())
+    return size
+
+
+class _MemoryBudget:
+    """Counts the estimated bytes held by the pipeline between its stages.
+
+    Only the producer waits for room (`acquire`); the later stages adjust
+    the count without blocking, so the pipeline always drains. An item
+    larger than the whole budget goes through when nothing else is held.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.used = 0
+        self._changed = threading.Condition()
+
+    def acquire(self, size: int) -> None:
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self.used == 0 or self.used + size <= self.limit
+            )
+            self.used += size
+
+    def adjust(self, delta: int) -> None:
+        with self._changed:
+            self.used += delta
+            self._changed.notify_all()
+
+
+class PipelineStats:
+    """Per-stage throughput counters of a PipelineIngestComponent call.
+
+    `busy` adds up the time spent by every worker of a stage, so a stage
+    that keeps its workers saturated has a utilization close to 1. The
+    files a stage dropped are kept with the ids of their documents, which
+    the call leaves out of what it returns.
+    """
+
+    STAGES = ("parse", "embed", "save")
+
+    def __init__(self, workers: dict[str, int]) -> None:
+        self.started = time.perf_counter()
+        self.workers = workers
+        self.files = dict.fromkeys(self.STAGES, 0)
+        self.items = dict.fromkeys(self.STAGES, 0)
+        self.busy = dict.fromkeys(self.STAGES, 0.0)
+        self.failed_files: list[str] = []
+        self.failed_doc_ids: set[str] = set()
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, files: int, items: int, seconds: float) -> None:
+        with self._lock:
+            self.files[stage] += files
+            self.items[stage] += items
+            self.busy[stage] += seconds
+
+    def record_failure(
+        self, file_name: str, documents: Iterable[Document] = ()
+    ) -> None:
+        with self._lock:
+            self.failed_files.append(file_name)
+            self.failed_doc_ids.update(document.doc_id for document in documents)
+
+    def summary(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        units = {"parse": "documents", "embed": "nodes", "save": "nodes"}
+        stages = ", ".join(
+            f"{stage}: {self.files[stage]} files / {self.items[stage]} "
+            f"{units[stage]} ({self.files[stage] / elapsed:.1f} files/s, "
+            f"{self.busy[stage] / (elapsed * self.workers[stage]):.0%} busy)"
+            for stage in self.STAGES
+        )
+        return f"{stages}, {len(self.failed_files)} failed in {elapsed:.1f}s"
+
+
+def _parse_file(file: tuple[str, Path]) -> tuple[str, list[Document] | None, float]:
+    # Runs in the parsing process pool
+    started = time.perf_counter()
+    documents = _transform_file_or_none(*file)
+    return file[0], documents, time.perf_counter() - started
+
+
 class PipelineIngestComponent(BaseIngestComponentWithIndex):
     """Pipeline ingestion - keeping the embedding worker pool as busy as possible.
 
-    This class implements a threaded ingestion pipeline, which comprises two threads
-    and two queues. The primary thread is responsible for reading and parsing files
-    into documents. These documents are then placed into a queue, which is
-    distributed to a pool of worker processes for embedding computation. After
-    embedding, the documents are transferred to another queue where they are
-    accumulated until a threshold is reached. Upon reaching this threshold, the
-    accumulated documents are flushed to the document store, index, and vector
-    store.
-
-    Exception handling ensures robustness against erroneous files. However, in the
-    pipelined design, one error can lead to the discarding of multiple files. Any
-    discarded files will be reported.
-    """
+    This class implements an ingestion pipeline of three stages connected by
+    two queues. A pool of worker processes reads and parses files into
+    documents, with a bounded number of files in flight. These documents
+    are placed into a queue, which is distributed to a pool of worker
+    threads for embedding computation. After embedding, the documents are
+    transferred to another queue where they are accumulated until they
+    reach a size threshold, or have waited for `flush_interval` seconds.
+    Then the accumulated documents are flushed to the document store,
+    index, and vector store.
 
-    NODE_FLUSH_COUNT = 5000  # Save the index every # nodes.
+    Memory is bounded by size rather than by item counts: parsing pauses
+    while the documents and nodes waiting between the stages are estimated
+    to hold more than `memory_budget` bytes, so one huge file cannot pile up
+    as much as a hundred small ones.
+
+    Errors are isolated per file: a file that fails to parse or embed is
+    skipped, and a flush that fails is retried file by file so that only the
+    offending files are discarded. Every call gets its own PipelineStats,
+    carried through the queues with its files, so concurrent calls only
+    see their own failures. Discarded files are reported, and each stage's
+    throughput is logged at the end of a bulk ingestion.
+    """
 
     def __init__(
         self,
@@ -341,11 +671,17 @@ class PipelineIngestComponent(BaseIngestComponentWithIndex):
         embed_model: EmbedType,
         transformations: list[TransformComponent],
         count_workers: int,
+        memory_budget: int = 512 * 2**20,
+        flush_bytes: int = 64 * 2**20,
+        flush_interval: float = 5.0,
         *args: Any,
         **kwargs: Any,
     ) -> None:
         super().__init__(storage_context, embed_model, transformations, *args, **kwargs)
         self.count_workers = count_workers
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self._memory = _MemoryBudget(memory_budget)
         assert (
             len(self.transformations) >= 2
         ), "Embeddings must be in the transformations"
@@ -355,31 +691,51 @@ class PipelineIngestComponent(BaseIngestComponentWithIndex):
         # To do not collide with the multiprocessing of huggingface, we disable it
         os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+        self._file_to_documents_work_pool = multiprocessing.Pool(
+            processes=self.count_workers
+        )
+        # Files handed to the parsing pool and not yet queued in doc_q, per
+        # bulk ingestion. Twice the pool size keeps every parser busy while a
+        # result is queued, without parsing far ahead of the embeddings.
+        self.parse_slots = 2 * self.count_workers
+
         # doc_q stores parsed files as Document chunks.
-        # Using a shallow queue causes the filesystem parser to block
-        # when it reaches capacity. This ensures it doesn't outpace the
-        # computationally intensive embeddings phase, avoiding unnecessary
-        # memory consumption.  The semaphore is used to bound the async worker
-        # embedding computations to cause the doc Q to fill and block.
+        # Putting in it waits on the memory budget, so the filesystem parser
+        # doesn't outpace the computationally intensive embeddings phase,
+        # avoiding unnecessary memory consumption.  The semaphore is used to
+        # bound the async worker embedding computations.
         self.doc_semaphore = multiprocessing.Semaphore(
             self.count_workers
-        )  # limit the doc queue to # items.
-        self.doc_q: Queue[tuple[str, str | None, list[Document] | None]] = Queue(20)
+        )  # limit the embeddings in progress to # items.
+        self.doc_q: Queue[
+            tuple[str, str | None, list[Document] | None, PipelineStats | None]
+        ] = Queue()
         # node_q stores documents parsed into nodes (embeddings).
-        # Larger queue size so we don't block the embedding workers during a slow
-        # index update.
+        # Unbounded so we don't block the embedding workers during a slow
+        # index update; its content still counts against the memory budget.
         self.node_q: Queue[
-            tuple[str, str | None, list[Document] | None, list[BaseNode] | None]
-        ] = Queue(40)
+            tuple[
+                str,
+                str | None,
+                list[Document] | None,
+                list[BaseNode] | None,
+                PipelineStats | None,
+            ]
+        ] = Queue()
         threading.Thread(target=self._doc_to_node, daemon=True).start()
         threading.Thread(target=self._write_nodes, daemon=True).start()
 
+    def _new_stats(self) -> PipelineStats:
+        return PipelineStats(
+            {"parse": self.count_workers, "embed": self.count_workers, "save": 1}
+        )
+
     def _doc_to_node(self) -> None:
         # Parse documents into nodes
         with multiprocessing.pool.ThreadPool(processes=self.count_workers) as pool:
             while True:
                 try:
-                    cmd, file_name, documents = self.doc_q.get(
+                    cmd, file_name, documents, stats = self.doc_q.get(
                         block=True
                     )  # Documents for a file
                     if cmd == "process":
@@ -387,7 +743,7 @@ class PipelineIngestComponent(BaseIngestComponentWithIndex):
                         # Acquire semaphore to control access to worker pool
                         self.doc_semaphore.acquire()
                         pool.apply_async(
-                            self._doc_to_node_worker, (file_name, documents)
+                            self._doc_to_node_worker, (file_name, documents, stats)
                         )
                     elif cmd == "quit":
                         break
@@ -395,89 +751,254 @@ class PipelineIngestComponent(BaseIngestComponentWithIndex):
                     if cmd != "process":
                         self.doc_q.task_done()  # unblock Q joins
 
-    def _doc_to_node_worker(self, file_name: str, documents: list[Document]) -> None:
+    def _doc_to_node_worker(
+        self, file_name: str, documents: list[Document], stats: PipelineStats
+    ) -> None:
         # CPU/GPU intensive work in its own process
+        started = time.perf_counter()
         try:
             nodes = run_transformations(
                 documents,  # type: ignore[arg-type]
                 self.transformations,
                 show_progress=self.show_progress,
             )
-            self.node_q.put(("process", file_name, documents, list(nodes)))
+            stats.record("embed", 1, len(nodes), time.perf_counter() - started)
+            # The file is held as nodes from now on
+            self._memory.adjust(_estimate_bytes(nodes) - _estimate_bytes(documents))
+            self.node_q.put(("process", file_name, documents, list(nodes), stats))
+        except Exception:
+            logger.exception(f"Embedding {file_name}")
+            stats.record_failure(file_name, documents)
+            self._memory.adjust(-_estimate_bytes(documents))
         finally:
             self.doc_semaphore.release()
             self.doc_q.task_done()  # unblock Q joins
 
+    def _insert(self, documents: list[Document], nodes: list[BaseNode]) -> None:
+        with self._index_thread_lock:
+            self._index.insert_nodes(nodes)
+            self._set_document_hashes(documents)
+            self._save_index()
+
+    def _discard(self, documents: list[Document], nodes: list[BaseNode]) -> None:
+        """Remove whatever part of a failed `_insert` made it into the stores.
+
+        Best effort: the stores may be failing too.
+        """
+        try:
+            with self._index_thread_lock:
+                for document in documents:
+                    self._index.delete_ref_doc(
+                        document.doc_id, delete_from_docstore=True
+                    )
+                # Nodes the docstore had not linked to their document yet. The
+                # index maps the nodes' ids in the vector store to their own
+                node_ids = {node.node_id for node in nodes}
+                index_struct = self._index.index_struct
+                for vector_id, node_id in list(index_struct.nodes_dict.items()):
+                    if node_id in node_ids:
+                        del index_struct.nodes_dict[vector_id]
+                for node_id in node_ids:
+                    self._index.docstore.delete_document(node_id, raise_error=False)
+                self._index.storage_context.index_store.add_index_struct(index_struct)
+                self._save_index()
+        except Exception:
+            logger.exception("Removing partially saved nodes")
+
     def _save_docs(
-        self, files: list[str], documents: list[Document], nodes: list[BaseNode]
+        self, batch: list[tuple[str, list[Document], list[BaseNode], PipelineStats]]
     ) -> None:
+        started = time.perf_counter()
+        batch_bytes = sum(_estimate_bytes(file_nodes) for _, _, file_nodes, _ in batch)
+        documents = [
+            document for _, file_documents, _, _ in batch for document in file_documents
+        ]
+        nodes = [node for _, _, file_nodes, _ in batch for node in file_nodes]
+        runs = {stats for *_, stats in batch}
         try:
             logger.info(
-                f"Saving {len(files)} files ({len(documents)} documents / {len(nodes)} nodes)"
+                f"Saving {len(batch)} files ({len(documents)} documents / {len(nodes)} nodes)"
             )
-            self._index.insert_nodes(nodes)
-            for document in documents:
-                self._index.docstore.set_document_hash(
-                    document.get_doc_id(), document.hash
-                )
-            self._save_index()
+            self._insert(documents, nodes)
+            saved = list(batch)
         except Exception:
-            # Tell the user so they can investigate these files
-            logger.exception(f"Processing files {files}")
+            # Find the offending files instead of discarding the whole batch,
+            # once the part of it that was written is gone again
+            logger.exception("Saving the batch, retrying file by file")
+            self._discard(documents, nodes)
+            saved = []
+            for file_name, file_documents, file_nodes, stats in batch:
+                try:
+                    self._insert(file_documents, file_nodes)
+                    saved.append((file_name, file_documents, file_nodes, stats))
+                except Exception:
+                    # Tell the user so they can investigate this file
+                    logger.exception(f"Processing file {file_name}")
+                    self._discard(file_documents, file_nodes)
+                    stats.record_failure(file_name, file_documents)
         finally:
             # Clearing work, even on exception, maintains a clean state.
-            nodes.clear()
-            documents.clear()
-            files.clear()
+            batch.clear()
+            self._memory.adjust(-batch_bytes)
+        # A batch can hold the files of several calls, each was waiting on it
+        seconds = time.perf_counter() - started
+        for stats in runs:
+            run_saved = [file_nodes for *_, file_nodes, s in saved if s is stats]
+            stats.record(
+                "save",
+                len(run_saved),
+                sum(len(file_nodes) for file_nodes in run_saved),
+                seconds,
+            )
 
     def _write_nodes(self) -> None:
         # Save nodes to index.  I/O intensive.
-        node_stack: list[BaseNode] = []
-        doc_stack: list[Document] = []
-        file_stack: list[str] = []
+        batch: list[tuple[str, list[Document], list[BaseNode], PipelineStats]] = []
+        batch_bytes = 0
+        deadline = 0.0
         while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                cmd, file_name, documents, nodes, stats = self.node_q.get(
+                    timeout=timeout
+                )
+            except Empty:
+                # Nothing else came in time, don't keep these nodes waiting
+                self._save_docs(batch)
+                batch_bytes = 0
+                continue
             try:
-                cmd, file_name, documents, nodes = self.node_q.get(block=True)
                 if cmd in ("flush", "quit"):
-                    if file_stack:
-                        self._save_docs(file_stack, doc_stack, node_stack)
+                    if batch:
+                        self._save_docs(batch)
+                        batch_bytes = 0
                     if cmd == "quit":
                         break
                 elif cmd == "process":
-                    node_stack.extend(nodes)  # type: ignore[arg-type]
-                    doc_stack.extend(documents)  # type: ignore[arg-type]
-                    file_stack.append(file_name)  # type: ignore[arg-type]
+                    if not batch:
+                        deadline = time.monotonic() + self.flush_interval
+                    batch.append((file_name, documents, nodes, stats))  # type: ignore[arg-type]
+                    batch_bytes += _estimate_bytes(nodes)  # type: ignore[arg-type]
                     # Constant saving is heavy on I/O - accumulate to a threshold
-                    if len(node_stack) >= self.NODE_FLUSH_COUNT:
-                        self._save_docs(file_stack, doc_stack, node_stack)
+                    if batch_bytes >= self.flush_bytes or time.monotonic() >= deadline:
+                        self._save_docs(batch)
+                        batch_bytes = 0
             finally:
                 self.node_q.task_done()
 
+    def _enqueue(
+        self, file_name: str, documents: list[Document], stats: PipelineStats
+    ) -> None:
+        # Waits for room in the memory budget
+        self._memory.acquire(_estimate_bytes(documents))
+        self.doc_q.put(("process", file_name, documents, stats))
+
     def _flush(self) -> None:
-        self.doc_q.put(("flush", None, None))
+        self.doc_q.put(("flush", None, None, None))
         self.doc_q.join()
-        self.node_q.put(("flush", None, None, None))
+        self.node_q.put(("flush", None, None, None, None))
         self.node_q.join()
 
+    def _parse_files(
+        self, files: list[tuple[str, Path]]
+    ) -> list[list[Document] | None]:
+        return self._file_to_documents_work_pool.starmap(_transform_file_or_none, files)
+
+    def _insert_documents(self, documents: list[Document]) -> set[str]:
+        by_file: dict[str, list[Document]] = defaultdict(list)
+        for document in documents:
+            by_file[document.metadata["file_name"]].append(document)
+        stats = self._new_stats()
+        for file_name, file_documents in by_file.items():
+            self._enqueue(file_name, file_documents, stats)
+        self._flush()
+        return set(stats.failed_files)
+
     def ingest(self, file_name: str, file_data: Path) -> list[Document]:
-        documents = IngestionHelper.transform_file_into_documents(file_name, file_data)
-        self.doc_q.put(("process", file_name, documents))
+        # Parsed in the pool to keep this thread free, like the bulk files
+        documents = self._file_to_documents_work_pool.apply(
+            IngestionHelper.transform_file_into_documents, (file_name, file_data)
+        )
+        stats = self._new_stats()
+        self._enqueue(file_name, documents, stats)
         self._flush()
+        if stats.failed_files:
+            raise RuntimeError(f"Could not embed or save file {file_name}")
         return documents
 
+    @staticmethod
+    def _bounded(
+        files: list[tuple[str, Path]],
+        slots: threading.Semaphore,
+        stop: threading.Event,
+    ) -> Iterator[tuple[str, Path]]:
+        # Consumed by the thread feeding the parsing pool, which blocks here
+        # until a parsed file has left for doc_q, or the ingestion stopped
+        for file in eta(files):
+            while not slots.acquire(timeout=0.5):
+                if stop.is_set():
+                    return
+            if stop.is_set():
+                return
+            yield file
+
+    def _feed_parsers(
+        self,
+        files: list[tuple[str, Path]],
+        slots: threading.Semaphore,
+        stop: threading.Event,
+        parsed: Queue[tuple[str, list[Document] | None, float]],
+    ) -> None:
+        # Runs in a thread of its own: waiting for a slot in the pool's task
+        # handler thread would hold up every other use of the pool meanwhile
+        for file in self._bounded(files, slots, stop):
+
+            def failed(error: BaseException, file_name: str = file[0]) -> None:
+                logger.error(f"Parsing {file_name}", exc_info=error)
+                parsed.put((file_name, None, 0.0))
+
+            self._file_to_documents_work_pool.apply_async(
+                _parse_file, (file,), callback=parsed.put, error_callback=failed
+            )
+
     def bulk_ingest(self, files: list[tuple[str, Path]]) -> list[Document]:
+        stats = self._new_stats()
         docs = []
-        for file_name, file_data in eta(files):
-            try:
-                documents = IngestionHelper.transform_file_into_documents(
-                    file_name, file_data
-                )
-                self.doc_q.put(("process", file_name, documents))
-                docs.extend(documents)
-            except Exception:
-                logger.exception(f"Skipping {file_data.name}")
+        slots = threading.Semaphore(self.parse_slots)
+        stop = threading.Event()
+        parsed: Queue[tuple[str, list[Document] | None, float]] = Queue()
+        feeder = threading.Thread(
+            target=self._feed_parsers, args=(files, slots, stop, parsed), daemon=True
+        )
+        feeder.start()
+        try:
+            for _ in range(len(files)):
+                file_name, documents, seconds = parsed.get()
+                try:
+                    if documents is None:
+                        stats.record_failure(file_name)
+                        continue
+                    stats.record("parse", 1, len(documents), seconds)
+                    self._enqueue(file_name, documents, stats)
+                    docs.extend(documents)
+                finally:
+                    slots.release()
+        finally:
+            # Otherwise, after an error, the feeder would wait for a slot forever
+            stop.set()
+            feeder.join()
         self._flush()
-        return docs
+        logger.info("Pipeline ingestion finished, %s", stats.summary())
+        if stats.failed_files:
+            logger.warning("Files not ingested: %s", sorted(stats.failed_files))
+        return [doc for doc in docs if doc.doc_id not in stats.failed_doc_ids]
+
+    def __del__(self) -> None:
+        # Using root logger to avoid the logger to be deleted before the pool
+        logging.debug("Closing the file to documents work pool")
+        self._file_to_documents_work_pool.close()
+        self._file_to_documents_work_pool.join()
+        self._file_to_documents_work_pool.terminate()
 
 
 def get_ingestion_component(
@@ -508,6 +1029,9 @@ def get_ingestion_component(
             embed_model=embed_model,
             transformations=transformations,
             count_workers=settings.embedding.count_workers,
+            memory_budget=settings.embedding.pipeline_memory_budget_mb * 2**20,
+            flush_bytes=settings.embedding.pipeline_flush_mb * 2**20,
+            flush_interval=settings.embedding.pipeline_flush_interval,
         )
     else:
         return SimpleIngestComponent(
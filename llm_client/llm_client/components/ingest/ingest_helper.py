@@ -1,3 +1,5 @@
+import hashlib
+import json
 import logging
 from pathlib import Path
 
@@ -109,3 +111,23 @@ class IngestionHelper:
             document.excluded_embed_metadata_keys = ["doc_id"]
             # We don't want the LLM to receive these metadata in the context
             document.excluded_llm_metadata_keys = ["file_name", "doc_id", "page_label"]
+
+    @staticmethod
+    def file_hash(file_data: Path) -> str:
+        """Hash of the file's bytes, to tell whether it changed since last time."""
+        digest = hashlib.sha256()
+        with file_data.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def document_hash(document: Document) -> str:
+        """Hash of a document's text and metadata, stable across ingestions.
+
+        `Document.hash` cannot be compared between two ingestions of the same
+        file, as the metadata it covers holds the (random) doc_id.
+        """
+        metadata = {k: v for k, v in document.metadata.items() if k != "doc_id"}
+        identity = document.text + json.dumps(metadata, sort_keys=True, default=str)
+        return hashlib.sha256(identity.encode()).hexdigest()
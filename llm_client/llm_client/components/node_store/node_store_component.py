@@ -1,3 +1,4 @@
+import json
 import logging
 
 from injector import inject, singleton
@@ -5,11 +6,40 @@ from llama_index.core.storage.docstore import BaseDocumentStore, SimpleDocumentS
 from llama_index.core.storage.index_store import SimpleIndexStore
 from llama_index.core.storage.index_store.types import BaseIndexStore
 
+from private_gpt.components.node_store.sqlite_store import (
+    SqliteDocumentStore,
+    SqliteIndexStore,
+    SqliteKVStore,
+)
 from private_gpt.paths import local_data_path
 from private_gpt.settings.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+SQLITE_NODESTORE_FILE = "nodestore.sqlite3"
+
+
+def _import_simple_stores(
+    kvstore: SqliteKVStore, index_store: SqliteIndexStore
+) -> None:
+    """Carry over what a `simple` node store persisted in local_data_path."""
+    docstore_path = local_data_path / "docstore.json"
+    if docstore_path.exists():
+        logger.info("Importing the simple document store into SQLite")
+        # A persisted SimpleKVStore maps collections to their key-value pairs
+        collections = json.loads(docstore_path.read_text())
+        for collection, values in collections.items():
+            kvstore.put_all(list(values.items()), collection=collection)
+    try:
+        simple_index_store = SimpleIndexStore.from_persist_dir(
+            persist_dir=str(local_data_path)
+        )
+    except FileNotFoundError:
+        return
+    logger.info("Importing the simple index store into SQLite")
+    for index_struct in simple_index_store.index_structs():
+        index_store.add_index_struct(index_struct)
+
 
 @singleton
 class NodeStoreComponent:
@@ -36,6 +66,15 @@ class NodeStoreComponent:
                     logger.debug("Local document store not found, creating a new one")
                     self.doc_store = SimpleDocumentStore()
 
+            case "sqlite":
+                local_data_path.mkdir(parents=True, exist_ok=True)
+                kvstore = SqliteKVStore(local_data_path / SQLITE_NODESTORE_FILE)
+                is_new = kvstore.is_empty()
+                self.index_store = SqliteIndexStore(kvstore)
+                self.doc_store = SqliteDocumentStore(kvstore)
+                if is_new:
+                    _import_simple_stores(kvstore, self.index_store)
+
             case "postgres":
                 try:
                     from llama_index.storage.docstore.postgres import (  # type: ignore
@@ -0,0 +1,260 @@
+"""Document and index stores backed by a single SQLite file.
+
+`simple` stores keep everything in memory and write it all out as JSON on
+every persist, so saving one file's nodes costs as much as saving the whole
+corpus. These stores write through to SQLite instead: each change is its own
+small transaction touching only the rows it changed, and persisting is a
+no-op.
+"""
+
+import dataclasses
+import json
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from llama_index.core.data_structs import IndexDict
+from llama_index.core.data_structs.data_structs import IndexStruct
+from llama_index.core.storage.docstore.keyval_docstore import KVDocumentStore
+from llama_index.core.storage.index_store.keyval_index_store import KVIndexStore
+from llama_index.core.storage.kvstore.types import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_COLLECTION,
+    BaseKVStore,
+)
+
+
+class SqliteKVStore(BaseKVStore):
+    """Key-value store keeping one row per (collection, key) in SQLite."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        # Used from the ingestion threads as well as the request threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS kv (
+                    collection TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (collection, key)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS index_nodes (
+                    index_id TEXT NOT NULL,
+                    vector_id TEXT NOT NULL,
+                    node_id TEXT NOT NULL,
+                    PRIMARY KEY (index_id, vector_id)
+                ) WITHOUT ROWID
+                """
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock, self._conn:
+            yield self._conn
+
+    def is_empty(self) -> bool:
+        with self._transaction() as conn:
+            return conn.execute("SELECT 1 FROM kv LIMIT 1").fetchone() is None
+
+    def put(self, key: str, val: dict, collection: str = DEFAULT_COLLECTION) -> None:
+        self.put_all([(key, val)], collection=collection)
+
+    async def aput(
+        self, key: str, val: dict, collection: str = DEFAULT_COLLECTION
+    ) -> None:
+        self.put(key, val, collection)
+
+    def put_all(
+        self,
+        kv_pairs: list[tuple[str, dict]],
+        collection: str = DEFAULT_COLLECTION,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        # One transaction whatever the batch size, it is the commit that costs
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO kv (collection, key, value) VALUES (?, ?, ?)",
+                [(collection, key, json.dumps(val)) for key, val in kv_pairs],
+            )
+
+    async def aput_all(
+        self,
+        kv_pairs: list[tuple[str, dict]],
+        collection: str = DEFAULT_COLLECTION,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        self.put_all(kv_pairs, collection, batch_size)
+
+    def get(self, key: str, collection: str = DEFAULT_COLLECTION) -> dict | None:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT value FROM kv WHERE collection = ? AND key = ?",
+                (collection, key),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def aget(self, key: str, collection: str = DEFAULT_COLLECTION) -> dict | None:
+        return self.get(key, collection)
+
+    def get_all(self, collection: str = DEFAULT_COLLECTION) -> dict[str, dict]:
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT key, value FROM kv WHERE collection = ?", (collection,)
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    async def aget_all(self, collection: str = DEFAULT_COLLECTION) -> dict[str, dict]:
+        return self.get_all(collection)
+
+    def delete(self, key: str, collection: str = DEFAULT_COLLECTION) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM kv WHERE collection = ? AND key = ?", (collection, key)
+            )
+        return cursor.rowcount > 0
+
+    async def adelete(self, key: str, collection: str = DEFAULT_COLLECTION) -> bool:
+        return self.delete(key, collection)
+
+    def get_index_nodes(self, index_id: str) -> dict[str, str]:
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT vector_id, node_id FROM index_nodes WHERE index_id = ?",
+                (index_id,),
+            ).fetchall()
+        return dict(rows)
+
+    def update_index_nodes(
+        self,
+        index_id: str,
+        upserts: list[tuple[str, str]],
+        deletes: list[str],
+    ) -> None:
+        with self._transaction() as conn:
+            conn.executemany(
+                "DELETE FROM index_nodes WHERE index_id = ? AND vector_id = ?",
+                [(index_id, vector_id) for vector_id in deletes],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO index_nodes (index_id, vector_id, node_id) "
+                "VALUES (?, ?, ?)",
+                [(index_id, vector_id, node_id) for vector_id, node_id in upserts],
+            )
+
+    def delete_index_nodes(self, index_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM index_nodes WHERE index_id = ?", (index_id,))
+
+
+class _TrackedNodes(dict[str, str]):
+    """The node map of an index, remembering which entries changed."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.changed: set[str] = set()
+
+    def __setitem__(self, key: str, value: str) -> None:
+        super().__setitem__(key, value)
+        self.changed.add(key)
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self.changed.add(key)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        self.changed.add(key)
+        return super().pop(key, *default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def popitem(self) -> tuple[str, str]:
+        key, value = super().popitem()
+        self.changed.add(key)
+        return key, value
+
+    def clear(self) -> None:
+        self.changed.update(self)
+        super().clear()
+
+
+class SqliteDocumentStore(KVDocumentStore):
+    def __init__(self, kvstore: SqliteKVStore) -> None:
+        super().__init__(kvstore)
+
+
+class SqliteIndexStore(KVIndexStore):
+    """Index store keeping the node map of a vector index in rows of its own.
+
+    The node map is the only part of an index struct that grows with the
+    corpus; stored inside the struct's JSON, every insert would rewrite all
+    of it. Here the struct is stored without it, and only the entries that
+    changed since the last write are written.
+    """
+
+    def __init__(self, kvstore: SqliteKVStore) -> None:
+        super().__init__(kvstore)
+        self._sqlite = kvstore
+
+    def _with_nodes(self, index_struct: IndexStruct) -> IndexStruct:
+        if isinstance(index_struct, IndexDict):
+            index_struct.nodes_dict = _TrackedNodes(
+                self._sqlite.get_index_nodes(index_struct.index_id)
+            )
+        return index_struct
+
+    def add_index_struct(self, index_struct: IndexStruct) -> None:
+        if not isinstance(index_struct, IndexDict):
+            super().add_index_struct(index_struct)
+            return
+
+        nodes = index_struct.nodes_dict
+        if isinstance(nodes, _TrackedNodes):
+            changed = set(nodes.changed)
+        else:
+            # A struct that was not loaded from here, e.g. a brand new index:
+            # diff it against the stored rows once, and track it from then on
+            stored = self._sqlite.get_index_nodes(index_struct.index_id)
+            changed = {key for key, value in nodes.items() if stored.get(key) != value}
+            changed.update(key for key in stored if key not in nodes)
+            index_struct.nodes_dict = nodes = _TrackedNodes(nodes)
+
+        super().add_index_struct(dataclasses.replace(index_struct, nodes_dict={}))
+        self._sqlite.update_index_nodes(
+            index_struct.index_id,
+            upserts=[(key, nodes[key]) for key in changed if key in nodes],
+            deletes=[key for key in changed if key not in nodes],
+        )
+        nodes.changed -= changed
+
+    def delete_index_struct(self, key: str) -> None:
+        super().delete_index_struct(key)
+        self._sqlite.delete_index_nodes(key)
+
+    def get_index_struct(self, struct_id: str | None = None) -> IndexStruct | None:
+        index_struct = super().get_index_struct(struct_id)
+        if struct_id is None or index_struct is None:
+            # Without an id, the struct comes from index_structs() below
+            return index_struct
+        return self._with_nodes(index_struct)
+
+    def index_structs(self) -> list[IndexStruct]:
+        return [self._with_nodes(struct) for struct in super().index_structs()]
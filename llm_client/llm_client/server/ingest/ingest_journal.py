@@ -0,0 +1,154 @@
+"""Checkpoint journal of a folder ingestion, so that it can be resumed.
+
+Every file of the run gets a row (path, size, mtime, hash, status), written
+as `pending` when the run is planned and moved to `done` or `failed` once
+the batch it belongs to has been committed to the index. A run that dies
+leaves its unfinished files `pending`; resuming it skips the `done` ones
+that did not change since and ingests everything else.
+
+Files are identified by their path relative to the folder being ingested,
+so one journal can hold the runs of several folders.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+
+from private_gpt.components.ingest.ingest_helper import IngestionHelper
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class IngestJournal:
+    def __init__(self, path: Path, root: Path) -> None:
+        self.path = path
+        # Absolute, so that a run can be resumed from another working directory
+        self.root = root.resolve()
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    root TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    hash TEXT,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (root, path)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _key(self, file_path: Path) -> tuple[str, str]:
+        return str(self.root), file_path.resolve().relative_to(self.root).as_posix()
+
+    def _is_done(self, file_path: Path, stat_size: int, stat_mtime: float) -> bool:
+        row = self._conn.execute(
+            "SELECT size, mtime, hash FROM files "
+            "WHERE root = ? AND path = ? AND status = ?",
+            (*self._key(file_path), DONE),
+        ).fetchone()
+        if row is None:
+            return False
+        size, mtime, file_hash = row
+        if size != stat_size:
+            return False
+        if mtime == stat_mtime:
+            return True
+        # Touched or copied over, only a different content needs ingesting
+        if file_hash != IngestionHelper.file_hash(file_path):
+            return False
+        with self._conn:
+            self._conn.execute(
+                "UPDATE files SET mtime = ? WHERE root = ? AND path = ?",
+                (stat_mtime, *self._key(file_path)),
+            )
+        return True
+
+    def plan(self, files: list[Path], resume: bool = False) -> list[Path]:
+        """Record `files` as the content of the run and return those to ingest.
+
+        Without `resume` the journal of the folder starts over and every
+        file is returned.
+        With it, files done in a previous run and unchanged since are left
+        out, and failed, pending or new files are returned.
+        """
+        if not resume:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM files WHERE root = ?", (str(self.root),)
+                )
+
+        to_ingest: list[Path] = []
+        rows = []
+        now = time.time()
+        for file_path in files:
+            stat = file_path.stat()
+            if resume and self._is_done(file_path, stat.st_size, stat.st_mtime):
+                continue
+            to_ingest.append(file_path)
+            rows.append(
+                (*self._key(file_path), stat.st_size, stat.st_mtime, PENDING, now)
+            )
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO files (root, path, size, mtime, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (root, path) DO UPDATE SET size = excluded.size, "
+                "mtime = excluded.mtime, status = excluded.status, "
+                "error = NULL, updated_at = excluded.updated_at",
+                rows,
+            )
+        return to_ingest
+
+    def mark_done(self, files: list[Path]) -> None:
+        # Hash once committed, the hash in the journal is the ingested one
+        rows = [
+            (
+                IngestionHelper.file_hash(file_path),
+                DONE,
+                time.time(),
+                *self._key(file_path),
+            )
+            for file_path in files
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE files SET hash = ?, status = ?, error = NULL, updated_at = ? "
+                "WHERE root = ? AND path = ?",
+                rows,
+            )
+
+    def mark_failed(self, files: list[Path], error: str) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE files SET status = ?, error = ?, updated_at = ? "
+                "WHERE root = ? AND path = ?",
+                [
+                    (FAILED, error, time.time(), *self._key(file_path))
+                    for file_path in files
+                ],
+            )
+
+    def counts(self) -> dict[str, int]:
+        rows = self._conn.execute(
+            "SELECT status, COUNT(*) FROM files WHERE root = ? GROUP BY status",
+            (str(self.root),),
+        ).fetchall()
+        return {PENDING: 0, DONE: 0, FAILED: 0, **dict(rows)}
+
+    def failed(self) -> list[tuple[str, str | None]]:
+        """(path relative to the folder, error) of the files that failed."""
+        return self._conn.execute(
+            "SELECT path, error FROM files WHERE root = ? AND status = ? ORDER BY path",
+            (str(self.root), FAILED),
+        ).fetchall()
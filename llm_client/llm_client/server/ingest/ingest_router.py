@@ -22,6 +22,10 @@ class IngestTextBody(BaseModel):
     )
 
 
+class IngestDeleteBody(BaseModel):
+    doc_ids: list[str] = Field(examples=[["c202d5e6-7b69-4869-81cc-dd574ee8ee11"]])
+
+
 class IngestResponse(BaseModel):
     object: Literal["list"]
     model: Literal["private-gpt"]
@@ -61,6 +65,26 @@ def ingest_file(request: Request, file: UploadFile) -> IngestResponse:
     return IngestResponse(object="list", model="private-gpt", data=ingested_documents)
 
 
+@ingest_router.post("/ingest/files", tags=["Ingestion"])
+def ingest_files(request: Request, files: list[UploadFile]) -> IngestResponse:
+    """Ingests and processes several files in a single call.
+
+    Behaves like `/ingest/file`, but all files are handed to the configured
+    ingestion mode at once, so `batch`, `parallel` and `pipeline` modes can
+    parse and embed them together and persist the index fewer times.
+
+    The `file_name` metadata of each returned Document tells which file it
+    was generated from.
+    """
+    service = request.state.injector.get(IngestService)
+    if any(file.filename is None for file in files):
+        raise HTTPException(400, "No file name provided")
+    ingested_documents = service.bulk_ingest_bin_data(
+        [(file.filename, file.file) for file in files]  # type: ignore[misc]
+    )
+    return IngestResponse(object="list", model="private-gpt", data=ingested_documents)
+
+
 @ingest_router.post("/ingest/text", tags=["Ingestion"])
 def ingest_text(request: Request, body: IngestTextBody) -> IngestResponse:
     """Ingests and processes a text, storing its chunks to be used as context.
@@ -102,3 +126,15 @@ def delete_ingested(request: Request, doc_id: str) -> None:
     """
     service = request.state.injector.get(IngestService)
     service.delete(doc_id)
+
+
+@ingest_router.post("/ingest/delete", tags=["Ingestion"])
+def delete_ingested_bulk(request: Request, body: IngestDeleteBody) -> None:
+    """Delete several ingested Documents at once.
+
+    Equivalent to calling `DELETE /ingest/{doc_id}` for every id in `doc_ids`,
+    but the storage context is persisted only once, which makes removing
+    many Documents much faster. Unknown ids are ignored.
+    """
+    service = request.state.injector.get(IngestService)
+    service.bulk_delete(body.doc_ids)
@@ -1,4 +1,5 @@
 import logging
+import shutil
 import tempfile
 from pathlib import Path
 from typing import TYPE_CHECKING, AnyStr, BinaryIO
@@ -88,6 +89,42 @@ class IngestService:
         logger.info("Finished ingestion file_name=%s", [f[0] for f in files])
         return [IngestedDoc.from_document(document) for document in documents]
 
+    def incremental_ingest(
+        self, files: list[tuple[str, Path]], remove_missing: bool = False
+    ) -> list[IngestedDoc]:
+        """Ingest the files that changed since they were last ingested.
+
+        Unchanged files are skipped and changed ones replace their previous
+        version. With `remove_missing`, previously synced files that are not
+        in `files` are deleted.
+        """
+        logger.info("Incrementally ingesting count=%s files", len(files))
+        documents = self.ingest_component.incremental_ingest(files, remove_missing)
+        logger.info("Finished incremental ingestion of count=%s files", len(files))
+        return [IngestedDoc.from_document(document) for document in documents]
+
+    def remove_missing_files(self, file_names: list[str]) -> None:
+        """Delete the incrementally synced files that are not in `file_names`."""
+        deleted = self.ingest_component.remove_missing_files(file_names)
+        logger.info("Removed count=%s documents of missing files", deleted)
+
+    def bulk_ingest_bin_data(
+        self, files: list[tuple[str, BinaryIO]]
+    ) -> list[IngestedDoc]:
+        logger.debug("Ingesting binary data of count=%s files", len(files))
+        # Same as _ingest_data, but all the files go through a single
+        # bulk_ingest call so the ingest component can batch their work
+        tmp_files: list[tuple[str, Path]] = []
+        try:
+            for file_name, raw_file_data in files:
+                with tempfile.NamedTemporaryFile(delete=False) as tmp:
+                    shutil.copyfileobj(raw_file_data, tmp)
+                tmp_files.append((file_name, Path(tmp.name)))
+            return self.bulk_ingest(tmp_files)
+        finally:
+            for _, path_to_tmp in tmp_files:
+                path_to_tmp.unlink(missing_ok=True)
+
     def list_ingested(self) -> list[IngestedDoc]:
         ingested_docs: list[IngestedDoc] = []
         try:
@@ -123,3 +160,11 @@ class IngestService:
             "Deleting the ingested document=%s in the doc and index store", doc_id
         )
         self.ingest_component.delete(doc_id)
+
+    def bulk_delete(self, doc_ids: list[str]) -> None:
+        """Delete several ingested documents, persisting the index once."""
+        logger.info(
+            "Deleting count=%s ingested documents in the doc and index store",
+            len(doc_ids),
+        )
+        self.ingest_component.bulk_delete(doc_ids)
@@ -157,7 +157,16 @@ class VectorstoreSettings(BaseModel):
 
 
 class NodeStoreSettings(BaseModel):
-    database: Literal["simple", "postgres"]
+    database: Literal["simple", "sqlite", "postgres"] = Field(
+        description=(
+            "Where the document and index stores are kept:\n"
+            "- simple: in memory, written out whole as JSON files in `local_data` "
+            "on every change.\n"
+            "- sqlite: in a SQLite file in `local_data`, writing only what "
+            "changed. The first start imports what `simple` persisted.\n"
+            "- postgres: in Postgres, see the `postgres` settings."
+        )
+    )
 
 
 class LlamaCPPSettings(BaseModel):
@@ -232,6 +241,31 @@ class EmbeddingSettings(BaseModel):
             "Do not set it higher than your number of threads of your CPU."
         ),
     )
+    pipeline_memory_budget_mb: int = Field(
+        512,
+        description=(
+            "In `pipeline` mode, the estimated memory (text and embeddings) that "
+            "parsed files may hold while they wait to be embedded and saved.\n"
+            "Parsing pauses when it is reached. A single file larger than the "
+            "budget is still ingested, alone."
+        ),
+    )
+    pipeline_flush_mb: int = Field(
+        64,
+        description=(
+            "In `pipeline` mode, embedded nodes are saved to the index once they "
+            "add up to this estimated size. Keep it well below "
+            "`pipeline_memory_budget_mb`."
+        ),
+    )
+    pipeline_flush_interval: float = Field(
+        5.0,
+        description=(
+            "In `pipeline` mode, the longest time in seconds embedded nodes wait "
+            "to be saved, so that a trickle of small files becomes searchable "
+            "quickly."
+        ),
+    )
     embed_dim: int = Field(
         384,
         description="The dimension of the embeddings stored in the Postgres database",
@@ -2,19 +2,42 @@
 
 import argparse
 import logging
+from collections.abc import Iterator
 from pathlib import Path
 
 from private_gpt.di import global_injector
+from private_gpt.paths import local_data_path
+from private_gpt.server.ingest.ingest_journal import IngestJournal
 from private_gpt.server.ingest.ingest_service import IngestService
 from private_gpt.server.ingest.ingest_watcher import IngestWatcher
 from private_gpt.settings.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_JOURNAL = local_data_path / "ingest_journal.sqlite3"
+
 
 class LocalIngestWorker:
-    def __init__(self, ingest_service: IngestService, setting: Settings) -> None:
+    def __init__(
+        self,
+        ingest_service: IngestService,
+        setting: Settings,
+        incremental: bool = False,
+        remove_missing: bool = False,
+        journal: IngestJournal | None = None,
+        resume: bool = False,
+        batch_size: int = 100,
+    ) -> None:
+        if journal is not None and not incremental:
+            # Retrying a batch that failed, or resuming one that was saved
+            # but not checkpointed, must not ingest its files a second time
+            raise ValueError("A journaled ingestion must be incremental")
         self.ingest_service = ingest_service
+        self.incremental = incremental
+        self.remove_missing = remove_missing
+        self.journal = journal
+        self.resume = resume
+        self.batch_size = batch_size
 
         self.total_documents = 0
         self.current_document_count = 0
@@ -55,11 +78,104 @@ class LocalIngestWorker:
     def ingest_folder(self, folder_path: Path, ignored: list[str]) -> None:
         # Count total documents before ingestion
         self._find_all_files_in_folder(folder_path, ignored)
-        self._ingest_all(self._files_under_root_folder)
+        if self.journal is None:
+            self._ingest_all(self._files_under_root_folder)
+        else:
+            self._ingest_journaled(self._files_under_root_folder, self.journal)
+
+    def _ingest_batch(self, batch: list[Path]) -> list[str]:
+        """Ingest a batch, returning the names of the files that produced documents.
+
+        Files the index has already synced are skipped and their documents
+        returned, so a batch can be ingested again without duplicates.
+        """
+        files = [(str(p.name), p) for p in batch]
+        ingested = self.ingest_service.incremental_ingest(files)
+        return [
+            doc.doc_metadata["file_name"]
+            for doc in ingested
+            if doc.doc_metadata and "file_name" in doc.doc_metadata
+        ]
+
+    def _batches(self, files: list[Path]) -> Iterator[list[Path]]:
+        """Split files into batches in which no two files share a name.
+
+        Ingested documents only carry their file's name, which is what tells
+        the files of a batch apart when checkpointing it.
+        """
+        while files:
+            batch: list[Path] = []
+            names: set[str] = set()
+            deferred: list[Path] = []
+            for file_path in files:
+                if file_path.name in names:
+                    deferred.append(file_path)
+                    continue
+                batch.append(file_path)
+                names.add(file_path.name)
+                if len(batch) == self.batch_size:
+                    yield batch
+                    batch, names = [], set()
+            if batch:
+                yield batch
+            files = deferred
+
+    def _ingest_journaled(
+        self, files_to_ingest: list[Path], journal: IngestJournal
+    ) -> None:
+        """Ingest in batches, checkpointing each committed batch in the journal."""
+        to_ingest = journal.plan(files_to_ingest, self.resume)
+        logger.info(
+            "Ingesting count=%s files, count=%s already done",
+            len(to_ingest),
+            len(files_to_ingest) - len(to_ingest),
+        )
+        done = 0
+        for batch in self._batches(to_ingest):
+            try:
+                ingested = set(self._ingest_batch(batch))
+            except Exception:
+                # Whatever failed took the batch down with it, find it out
+                logger.exception("Failed to ingest a batch, retrying file by file")
+                for file_path in batch:
+                    try:
+                        ingested = set(self._ingest_batch([file_path]))
+                    except Exception as e:
+                        logger.exception(f"Failed to ingest document: {file_path}")
+                        journal.mark_failed([file_path], repr(e))
+                        continue
+                    self._checkpoint([file_path], ingested, journal)
+            else:
+                self._checkpoint(batch, ingested, journal)
+            done += len(batch)
+            logger.info(
+                "Ingested count=%s/%s files, count=%s failed",
+                done,
+                len(to_ingest),
+                journal.counts()["failed"],
+            )
+
+        if self.remove_missing:
+            self.ingest_service.remove_missing_files([p.name for p in files_to_ingest])
+        for path, error in journal.failed():
+            logger.warning("Not ingested: file=%s error=%s", path, error)
+
+    @staticmethod
+    def _checkpoint(
+        batch: list[Path], ingested: set[str], journal: IngestJournal
+    ) -> None:
+        journal.mark_done([p for p in batch if p.name in ingested])
+        journal.mark_failed(
+            [p for p in batch if p.name not in ingested], "No documents were ingested"
+        )
 
     def _ingest_all(self, files_to_ingest: list[Path]) -> None:
         logger.info("Ingesting files=%s", [f.name for f in files_to_ingest])
-        self.ingest_service.bulk_ingest([(str(p.name), p) for p in files_to_ingest])
+        files = [(str(p.name), p) for p in files_to_ingest]
+        if self.incremental:
+            self.ingest_service.incremental_ingest(files, self.remove_missing)
+        else:
+            self.ingest_service.bulk_ingest(files)
 
     def ingest_on_watch(self, changed_path: Path) -> None:
         logger.info("Detected change in at path=%s, ingesting", changed_path)
@@ -69,7 +185,12 @@ class LocalIngestWorker:
         try:
             if changed_path.exists():
                 logger.info(f"Started ingesting file={changed_path}")
-                self.ingest_service.ingest_file(changed_path.name, changed_path)
+                if self.incremental:
+                    self.ingest_service.incremental_ingest(
+                        [(changed_path.name, changed_path)]
+                    )
+                else:
+                    self.ingest_service.ingest_file(changed_path.name, changed_path)
                 logger.info(f"Completed ingesting file={changed_path}")
         except Exception:
             logger.exception(
@@ -85,6 +206,38 @@ parser.add_argument(
     action=argparse.BooleanOptionalAction,
     default=False,
 )
+parser.add_argument(
+    "--incremental",
+    help="Skip files unchanged since the last incremental run, replace changed ones",
+    action=argparse.BooleanOptionalAction,
+    default=False,
+)
+parser.add_argument(
+    "--remove-missing",
+    help="With --incremental, delete previously ingested files that are gone",
+    action=argparse.BooleanOptionalAction,
+    default=False,
+)
+parser.add_argument(
+    "--resume",
+    help="With --incremental, journal the run, skipping the files a previous "
+    "journaled run of the folder completed, unchanged since, and retrying the rest",
+    action=argparse.BooleanOptionalAction,
+    default=False,
+)
+parser.add_argument(
+    "--journal",
+    help="With --incremental, ingest in batches, checkpointed in this journal, so "
+    f"that the run can be resumed. With --resume, defaults to {DEFAULT_JOURNAL}",
+    type=Path,
+    default=None,
+)
+parser.add_argument(
+    "--batch-size",
+    help="With a journal, number of files ingested and checkpointed at a time",
+    type=int,
+    default=100,
+)
 parser.add_argument(
     "--ignored",
     nargs="*",
@@ -98,27 +251,42 @@ parser.add_argument(
     default=None,
 )
 
-args = parser.parse_args()
+if __name__ == "__main__":
+    args = parser.parse_args()
+    if (args.resume or args.journal is not None) and not args.incremental:
+        parser.error("--resume and --journal only work with --incremental")
 
-# Set up logging to a file if a path is provided
-if args.log_file:
-    file_handler = logging.FileHandler(args.log_file, mode="a")
-    file_handler.setFormatter(
-        logging.Formatter(
-            "[%(asctime)s.%(msecs)03d] [%(levelname)s] %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
+    # Set up logging to a file if a path is provided
+    if args.log_file:
+        file_handler = logging.FileHandler(args.log_file, mode="a")
+        file_handler.setFormatter(
+            logging.Formatter(
+                "[%(asctime)s.%(msecs)03d] [%(levelname)s] %(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            )
         )
-    )
-    logger.addHandler(file_handler)
+        logger.addHandler(file_handler)
 
-if __name__ == "__main__":
     root_path = Path(args.folder)
     if not root_path.exists():
         raise ValueError(f"Path {args.folder} does not exist")
 
     ingest_service = global_injector.get(IngestService)
     settings = global_injector.get(Settings)
-    worker = LocalIngestWorker(ingest_service, settings)
+    journal = None
+    if args.journal is not None or args.resume:
+        journal_path = args.journal or DEFAULT_JOURNAL
+        journal_path.parent.mkdir(parents=True, exist_ok=True)
+        journal = IngestJournal(journal_path, root_path)
+    worker = LocalIngestWorker(
+        ingest_service,
+        settings,
+        args.incremental,
+        args.remove_missing,
+        journal=journal,
+        resume=args.resume,
+        batch_size=args.batch_size,
+    )
     worker.ingest_folder(root_path, args.ignored)
 
     if args.ignored:
@@ -0,0 +1,26 @@
+import threading
+
+from private_gpt.components.ingest.ingest_component import _MemoryBudget
+
+
+def test_memory_budget_blocks_the_producer_until_there_is_room() -> None:
+    budget = _MemoryBudget(limit=10)
+    budget.acquire(8)
+
+    producer = threading.Thread(target=budget.acquire, args=(5,))
+    producer.start()
+    producer.join(0.1)
+    assert producer.is_alive(), "8 + 5 bytes do not fit in 10"
+
+    budget.adjust(-8)
+    producer.join(1)
+    assert not producer.is_alive()
+    assert budget.used == 5
+
+
+def test_memory_budget_lets_an_oversized_item_through_alone() -> None:
+    budget = _MemoryBudget(limit=10)
+
+    budget.acquire(25)
+
+    assert budget.used == 25
@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from llama_index.core.data_structs import IndexDict
+from llama_index.core.schema import TextNode
+
+from private_gpt.components.node_store.sqlite_store import (
+    SqliteDocumentStore,
+    SqliteIndexStore,
+    SqliteKVStore,
+)
+
+
+def test_sqlite_docstore_survives_a_restart(tmp_path: Path) -> None:
+    path = tmp_path / "nodestore.sqlite3"
+    node = TextNode(text="hello there", id_="node-1")
+    SqliteDocumentStore(SqliteKVStore(path)).add_documents([node])
+
+    doc_store = SqliteDocumentStore(SqliteKVStore(path))
+
+    assert doc_store.get_node("node-1").get_content() == "hello there"
+
+
+def test_sqlite_index_store_writes_only_changed_nodes(tmp_path: Path) -> None:
+    path = tmp_path / "nodestore.sqlite3"
+    kvstore = SqliteKVStore(path)
+    index_store = SqliteIndexStore(kvstore)
+    index_struct = IndexDict()
+    for i in range(3):
+        index_struct.add_node(TextNode(text=str(i), id_=f"node-{i}"))
+    index_store.add_index_struct(index_struct)
+
+    index_struct.add_node(TextNode(text="3", id_="node-3"))
+    index_struct.delete("node-0")
+    assert index_struct.nodes_dict.changed == {"node-3", "node-0"}
+    index_store.add_index_struct(index_struct)
+    assert not index_struct.nodes_dict.changed
+
+    reloaded = SqliteIndexStore(SqliteKVStore(path)).get_index_struct(
+        index_struct.index_id
+    )
+    assert set(reloaded.nodes_dict) == {"node-1", "node-2", "node-3"}
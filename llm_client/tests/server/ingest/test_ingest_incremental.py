@@ -0,0 +1,87 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from private_gpt.server.ingest.ingest_service import IngestService
+from tests.fixtures.mock_injector import MockInjector
+
+
+def _ingested_ids(ingest_service: IngestService, file_name: str) -> set[str]:
+    return {
+        doc.doc_id
+        for doc in ingest_service.list_ingested()
+        if doc.doc_metadata and doc.doc_metadata.get("file_name") == file_name
+    }
+
+
+def test_incremental_ingest_skips_unchanged_files(
+    injector: MockInjector, tmp_path: Path
+) -> None:
+    ingest_service = injector.get(IngestService)
+    path = tmp_path / "incremental_unchanged.txt"
+    path.write_text("The same content on every run")
+
+    first = ingest_service.incremental_ingest([(path.name, path)])
+    second = ingest_service.incremental_ingest([(path.name, path)])
+
+    assert [doc.doc_id for doc in second] == [doc.doc_id for doc in first]
+    assert _ingested_ids(ingest_service, path.name) == {doc.doc_id for doc in first}
+
+
+def test_incremental_ingest_replaces_changed_files(
+    injector: MockInjector, tmp_path: Path
+) -> None:
+    ingest_service = injector.get(IngestService)
+    path = tmp_path / "incremental_changed.txt"
+    path.write_text("First version")
+    first = ingest_service.incremental_ingest([(path.name, path)])
+
+    path.write_text("Second version")
+    second = ingest_service.incremental_ingest([(path.name, path)])
+
+    assert {doc.doc_id for doc in second}.isdisjoint(doc.doc_id for doc in first)
+    assert _ingested_ids(ingest_service, path.name) == {doc.doc_id for doc in second}
+
+
+def test_incremental_ingest_removes_missing_files(
+    injector: MockInjector, tmp_path: Path
+) -> None:
+    ingest_service = injector.get(IngestService)
+    kept = tmp_path / "incremental_kept.txt"
+    gone = tmp_path / "incremental_gone.txt"
+    kept.write_text("Still here")
+    gone.write_text("About to vanish")
+    ingest_service.incremental_ingest([(kept.name, kept), (gone.name, gone)])
+
+    ingest_service.incremental_ingest([(kept.name, kept)], remove_missing=True)
+
+    assert _ingested_ids(ingest_service, kept.name)
+    assert not _ingested_ids(ingest_service, gone.name)
+
+
+def test_incremental_ingest_keeps_files_the_pipeline_failed_to_save(
+    injector: MockInjector, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    injector.bind_settings(
+        {"embedding": {"ingest_mode": "pipeline", "count_workers": 2}}
+    )
+    ingest_service = injector.get(IngestService)
+    path = tmp_path / "incremental_unsaved.txt"
+    path.write_text("First version")
+    first = ingest_service.incremental_ingest([(path.name, path)])
+
+    def fail_to_save(*args: Any) -> None:
+        raise RuntimeError("The index is unavailable")
+
+    monkeypatch.setattr(ingest_service.ingest_component, "_insert", fail_to_save)
+    path.write_text("Second version")
+    second = ingest_service.incremental_ingest([(path.name, path)])
+
+    assert [doc.doc_id for doc in second] == [doc.doc_id for doc in first]
+    assert _ingested_ids(ingest_service, path.name) == {doc.doc_id for doc in first}
+
+    # The file was not recorded as synced, so the next run tries it again
+    monkeypatch.undo()
+    third = ingest_service.incremental_ingest([(path.name, path)])
+    assert {doc.doc_id for doc in third}.isdisjoint(doc.doc_id for doc in first)
@@ -0,0 +1,115 @@
+import os
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from llama_index.core.schema import Document
+
+from private_gpt.server.ingest.ingest_journal import IngestJournal
+from private_gpt.server.ingest.ingest_service import IngestService
+from private_gpt.settings.settings import Settings
+from scripts.ingest_folder import LocalIngestWorker
+from tests.fixtures.mock_injector import MockInjector
+
+
+def _files(tmp_path: Path, *names: str) -> list[Path]:
+    paths = [tmp_path / "folder" / name for name in names]
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"Content of {path.name}")
+    return paths
+
+
+def _journal(tmp_path: Path) -> IngestJournal:
+    return IngestJournal(tmp_path / "journal.sqlite3", tmp_path / "folder")
+
+
+def test_resume_skips_done_files_and_retries_the_rest(tmp_path: Path) -> None:
+    done, failed, pending = _files(tmp_path, "done.txt", "failed.txt", "pending.txt")
+    journal = _journal(tmp_path)
+    assert journal.plan([done, failed, pending]) == [done, failed, pending]
+    journal.mark_done([done])
+    journal.mark_failed([failed], "boom")
+    journal.close()
+
+    # As if the run had died before getting to pending.txt
+    journal = _journal(tmp_path)
+    new = _files(tmp_path, "new.txt")[0]
+
+    assert journal.plan([done, failed, pending, new], resume=True) == [
+        failed,
+        pending,
+        new,
+    ]
+    assert journal.counts() == {"pending": 3, "done": 1, "failed": 0}
+
+
+def test_resume_retries_done_files_that_changed(tmp_path: Path) -> None:
+    touched, changed = _files(tmp_path, "touched.txt", "changed.txt")
+    journal = _journal(tmp_path)
+    journal.plan([touched, changed])
+    journal.mark_done([touched, changed])
+
+    os.utime(touched, (0, 0))
+    changed.write_text("Something else entirely")
+
+    assert journal.plan([touched, changed], resume=True) == [changed]
+
+
+def test_plan_without_resume_starts_over(tmp_path: Path) -> None:
+    (done,) = _files(tmp_path, "done.txt")
+    journal = _journal(tmp_path)
+    journal.plan([done])
+    journal.mark_done([done])
+
+    assert journal.plan([done]) == [done]
+    assert journal.counts()["done"] == 0
+
+
+def test_files_with_the_same_name_are_told_apart(tmp_path: Path) -> None:
+    first, second = _files(tmp_path, "a/paper.txt", "b/paper.txt")
+    journal = _journal(tmp_path)
+    journal.plan([first, second])
+    journal.mark_done([first])
+    journal.mark_failed([second], "boom")
+
+    assert journal.failed() == [("b/paper.txt", "boom")]
+    assert journal.plan([first, second], resume=True) == [second]
+
+
+def test_journaled_run_retries_a_failed_batch_without_duplicates(
+    injector: MockInjector, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    injector.bind_settings({"data": {"local_ingestion": {"enabled": True}}})
+    ingest_service = injector.get(IngestService)
+    component = ingest_service.ingest_component
+    insert_documents = component._insert_documents
+
+    def fail_halfway(documents: list[Document]) -> set[str]:
+        # The first file of the batch makes it into the index, then it fails
+        first = documents[0].metadata["file_name"]
+        insert_documents([d for d in documents if d.metadata["file_name"] == first])
+        monkeypatch.undo()
+        raise RuntimeError("The index went away")
+
+    monkeypatch.setattr(component, "_insert_documents", fail_halfway)
+    names = ("journaled_a.txt", "journaled_b.txt", "journaled_c.txt")
+    _files(tmp_path, *names)
+    journal = _journal(tmp_path)
+    worker = LocalIngestWorker(
+        ingest_service,
+        injector.get(Settings),
+        incremental=True,
+        journal=journal,
+        batch_size=len(names),
+    )
+
+    worker.ingest_folder(tmp_path / "folder", [])
+
+    docs_per_file = Counter(
+        doc.doc_metadata["file_name"]
+        for doc in ingest_service.list_ingested()
+        if doc.doc_metadata and doc.doc_metadata.get("file_name") in names
+    )
+    assert docs_per_file == dict.fromkeys(names, 1)
+    assert journal.counts() == {"pending": 0, "done": 3, "failed": 0}
@@ -0,0 +1,133 @@
+import multiprocessing
+import threading
+from pathlib import Path
+from queue import Queue
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from llama_index.core.data_structs import IndexDict
+from llama_index.core.schema import BaseNode, Document, TextNode
+
+from private_gpt.components.ingest.ingest_component import (
+    PipelineIngestComponent,
+    PipelineStats,
+    _MemoryBudget,
+)
+from private_gpt.components.node_store.sqlite_store import (
+    SqliteDocumentStore,
+    SqliteIndexStore,
+    SqliteKVStore,
+)
+from private_gpt.server.ingest.ingest_router import IngestResponse
+
+PIPELINE_SETTINGS = {"embedding": {"ingest_mode": "pipeline", "count_workers": 2}}
+
+
+@pytest.mark.parametrize("test_client", [PIPELINE_SETTINGS], indirect=True)
+def test_pipeline_ingest_isolates_files_that_fail_to_parse(
+    test_client: TestClient,
+) -> None:
+    files = [
+        ("files", ("pipeline_good.txt", b"Some perfectly fine text")),
+        ("files", ("pipeline_broken.json", b"{this is not json")),
+        ("files", ("pipeline_also_good.txt", b"More fine text")),
+    ]
+    response = test_client.post("/v1/ingest/files", files=files)
+
+    assert response.status_code == 200
+    ingest_result = IngestResponse.model_validate(response.json())
+    file_names = {doc.doc_metadata["file_name"] for doc in ingest_result.data}
+    assert file_names == {"pipeline_good.txt", "pipeline_also_good.txt"}
+
+
+def test_pipeline_stops_feeding_the_parsers_once_stopped() -> None:
+    slots = threading.Semaphore(1)
+    stop = threading.Event()
+    files = [(name, Path(name)) for name in ("a.txt", "b.txt", "c.txt")]
+    feed = PipelineIngestComponent._bounded(files, slots, stop)
+    assert next(feed)[0] == "a.txt"
+
+    # The consumer failed before releasing the slot of a.txt
+    stop.set()
+
+    assert list(feed) == []
+
+
+def test_pipeline_feeder_does_not_hold_up_the_parsing_pool(tmp_path: Path) -> None:
+    files = []
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_text(f"Content of {name}")
+        files.append((name, tmp_path / name))
+    component = PipelineIngestComponent.__new__(PipelineIngestComponent)
+    with multiprocessing.Pool(processes=1) as pool:
+        component._file_to_documents_work_pool = pool
+        slots = threading.Semaphore(1)
+        stop = threading.Event()
+        parsed: Queue[Any] = Queue()
+        feeder = threading.Thread(
+            target=component._feed_parsers, args=(files, slots, stop, parsed)
+        )
+        feeder.start()
+        assert parsed.get(timeout=30)[0] == "a.txt"
+
+        # The feeder waits for the slot of a.txt, other users of the pool don't
+        assert pool.apply(len, ("other work",)) == 10
+
+        stop.set()
+        feeder.join(timeout=5)
+        assert not feeder.is_alive()
+
+
+def test_pipeline_failures_count_against_the_call_of_the_file() -> None:
+    component = PipelineIngestComponent.__new__(PipelineIngestComponent)
+    component._memory = _MemoryBudget(2**20)
+
+    def insert(documents: list[Document], nodes: list[BaseNode]) -> None:
+        if any(
+            document.metadata["file_name"] == "broken.txt" for document in documents
+        ):
+            raise RuntimeError("Cannot save")
+
+    component._insert = insert  # type: ignore[method-assign]
+    component._discard = lambda documents, nodes: None  # type: ignore[method-assign]
+    workers = {"parse": 1, "embed": 1, "save": 1}
+    first, second = PipelineStats(workers), PipelineStats(workers)
+    good = Document(text="Fine", metadata={"file_name": "good.txt"})
+    broken = Document(text="Not fine", metadata={"file_name": "broken.txt"})
+
+    component._save_docs(
+        [("good.txt", [good], [], first), ("broken.txt", [broken], [], second)]
+    )
+
+    assert (first.failed_files, first.failed_doc_ids) == ([], set())
+    assert (second.failed_files, second.failed_doc_ids) == (
+        ["broken.txt"],
+        {broken.doc_id},
+    )
+    assert (first.files["save"], second.files["save"]) == (1, 0)
+
+
+def test_pipeline_discard_removes_nodes_by_their_vector_id(tmp_path: Path) -> None:
+    path = tmp_path / "nodestore.sqlite3"
+    index_store = SqliteIndexStore(SqliteKVStore(path))
+    index_struct = IndexDict()
+    node = TextNode(text="Saved halfway", id_="node-1")
+    index_struct.add_node(node, text_id="vector-1")
+    index_store.add_index_struct(index_struct)
+    component = PipelineIngestComponent.__new__(PipelineIngestComponent)
+    component._index_thread_lock = threading.Lock()
+    component._index = SimpleNamespace(  # type: ignore[assignment]
+        index_struct=index_struct,
+        docstore=SqliteDocumentStore(SqliteKVStore(path)),
+        storage_context=SimpleNamespace(index_store=index_store),
+    )
+    component._save_index = lambda: None  # type: ignore[method-assign]
+
+    component._discard([], [node])
+
+    reloaded = SqliteIndexStore(SqliteKVStore(path)).get_index_struct(
+        index_struct.index_id
+    )
+    assert reloaded.nodes_dict == {}
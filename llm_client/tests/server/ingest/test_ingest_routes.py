@@ -19,6 +19,19 @@ def test_ingest_accepts_pdf_files(ingest_helper: IngestHelper) -> None:
     assert len(ingest_result.data) == 1
 
 
+def test_ingest_accepts_multiple_files(test_client: TestClient) -> None:
+    folder = Path(__file__).parents[0]
+    files = [
+        ("files", (path.name, path.open("rb")))
+        for path in (folder / "test.txt", folder / "test.pdf")
+    ]
+    response = test_client.post("/v1/ingest/files", files=files)
+    assert response.status_code == 200
+    ingest_result = IngestResponse.model_validate(response.json())
+    file_names = {doc.doc_metadata["file_name"] for doc in ingest_result.data}
+    assert file_names == {"test.txt", "test.pdf"}
+
+
 def test_ingest_list_returns_something_after_ingestion(
     test_client: TestClient, ingest_helper: IngestHelper
 ) -> None:
@@ -37,6 +50,24 @@ def test_ingest_list_returns_something_after_ingestion(
     ), "The temp doc should be returned"
 
 
+def test_ingest_bulk_delete_removes_every_document(
+    test_client: TestClient, ingest_helper: IngestHelper
+) -> None:
+    path = Path(__file__).parents[0] / "test.txt"
+    doc_ids = [
+        ingest_helper.ingest_file(path).data[0].doc_id,
+        ingest_helper.ingest_file(path).data[0].doc_id,
+    ]
+
+    response = test_client.post("/v1/ingest/delete", json={"doc_ids": doc_ids})
+    assert response.status_code == 200
+
+    remaining = {
+        doc["doc_id"] for doc in test_client.get("/v1/ingest/list").json()["data"]
+    }
+    assert remaining.isdisjoint(doc_ids)
+
+
 def test_ingest_plain_text(test_client: TestClient) -> None:
     response = test_client.post(
         "/v1/ingest/text", json={"file_name": "file_name", "text": "text"}